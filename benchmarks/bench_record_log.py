@@ -0,0 +1,60 @@
+"""Benchmark sustained patient record submissions per second through the group-committed record log.
+
+Usage: python benchmarks/bench_record_log.py [sessions ...]
+
+Each simulated clinician session submits one record at a time and waits for it to be
+durable, like the Patient Entry form does. Group commit is compared against a log
+that fsyncs every submission on its own (max_batch=1). The logs are written to a
+temporary directory on the same filesystem as the repo so fsync costs are realistic.
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from patient_records import RecordLog
+
+
+SUBMISSIONS_PER_SESSION = 200
+
+
+def sample_record(session, i):
+    return {
+        'PatientID': f'THY-{session:02d}{i:03d}', 'First_Name': 'Test', 'Last_Name': f'Patient {i}',
+        'Gender': 'Female', 'Fatigue': 'Mild', 'TSH': 2.5, 'Risk_Score': 3, 'Risk_Level': 'Low',
+    }
+
+
+def run(sessions, per_session, **options):
+    with tempfile.TemporaryDirectory(dir=Path(__file__).resolve().parent) as store_dir:
+        log = RecordLog(store_dir, **options)
+
+        def clinician(session):
+            for i in range(per_session):
+                log.submit([sample_record(session, i)])
+
+        threads = [threading.Thread(target=clinician, args=(session,)) for session in range(sessions)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        log.close()
+        assert log.count() == sessions * per_session, 'records lost'
+        return sessions * per_session / elapsed, log.committed / log.commits
+
+
+def main(session_counts):
+    print(f"{'sessions':>8} {'per-record (rec/s)':>19} {'group (rec/s)':>14} {'records/fsync':>14} {'speedup':>8}")
+    for sessions in session_counts:
+        single_rate, _ = run(sessions, SUBMISSIONS_PER_SESSION, max_batch=1, max_wait=0)
+        group_rate, batch = run(sessions, SUBMISSIONS_PER_SESSION)
+        print(f'{sessions:>8} {single_rate:>19,.0f} {group_rate:>14,.0f} {batch:>14.1f} {group_rate / single_rate:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1, 8, 32])
@@ -0,0 +1,77 @@
+"""Benchmark the single-pass table extractor against the original per-cell find_all parser.
+
+Usage: python benchmarks/bench_table_parser.py [rows ...]
+
+The fixture page mimics a RUET teacher_list page and is generated on first run
+into benchmarks/fixtures/ so repeated runs parse the same bytes.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+import pandas as pd
+from scraper_utils import extract_table
+from web_scrapping4 import TEACHER_COLUMNS
+
+
+FIXTURE_DIR = Path(__file__).resolve().parent / 'fixtures'
+DESIGNATIONS = ['Professor', 'Assistant Professor', 'Associate Professor', 'Lecturer', 'Senior Lecturer', 'Instructor']
+
+
+def fixture_page(rows):
+    path = FIXTURE_DIR / f'teacher_list_{rows}.html'
+    if not path.exists():
+        FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+        body = ''.join(
+            f'<tr><td>{i}</td><td>Teacher {i}</td><td>শিক্ষক {i}</td><td>{DESIGNATIONS[i % 6]}</td>'
+            f'<td>CSE</td><td>teacher{i}@cse.ruet.ac.bd</td><td>+880{i:08d}</td><td><img src="t{i}.jpg"></td></tr>'
+            for i in range(rows)
+        )
+        nav = ''.join(f'<li><a href="/p{i}">Link {i}</a></li>' for i in range(200))
+        path.write_text(
+            f'<html><head><title>Teachers</title></head><body><ul>{nav}</ul><table>'
+            '<tr><th>#</th><th>Name</th><th>Name (BN)</th><th>Designation</th><th>Department</th>'
+            f'<th>Email</th><th>Phone</th><th>Photo</th></tr>{body}</table></body></html>',
+            encoding='utf-8'
+        )
+    return path.read_text(encoding='utf-8')
+
+
+def legacy_parse(html):
+    """The original get_data loop: find_all('td') once per field"""
+    soup = BeautifulSoup(html, 'lxml')
+    columns = {name: [] for name in TEACHER_COLUMNS}
+    for teacher in soup.find_all('tr')[1:]:
+        for name, index in TEACHER_COLUMNS.items():
+            columns[name].append(teacher.find_all('td')[index].text.strip())
+    return pd.DataFrame(columns)
+
+
+def single_pass_parse(html):
+    return pd.DataFrame(extract_table(html, TEACHER_COLUMNS))
+
+
+def best_of(fn, html, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'legacy (s)':>12} {'single-pass (s)':>16} {'speedup':>8}")
+    for rows in sizes:
+        html = fixture_page(rows)
+        legacy_time, legacy = best_of(legacy_parse, html)
+        fast_time, fast = best_of(single_pass_parse, html)
+        assert legacy.equals(fast), 'parsers disagree'
+        print(f'{rows:>8} {legacy_time:>12.3f} {fast_time:>16.3f} {legacy_time / fast_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000])
@@ -0,0 +1,74 @@
+"""Report per-module import cost with `python -X importtime` and enforce a cold-start budget.
+
+Usage: python benchmarks/check_import_time.py [--budget-ms 1500] [--top 15] [module ...]
+
+Each module is imported in a fresh interpreter, so the numbers are cold-start
+costs. The default target is simpleapp itself (what Streamlit executes before
+the Main Terminal can paint); the script exits non-zero when any target's
+cumulative import time exceeds the budget.
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 1500
+
+
+def import_times(module):
+    """Return [(package, self_ms, cumulative_ms)] for one cold import of module"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'import {module} failed:\n{result.stderr[-2000:]}')
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times.append((name.rstrip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return times
+
+
+def direct_imports(times, module):
+    """Packages imported directly by module (one nesting level below it), most expensive first"""
+    children = []
+    for name, self_ms, cumulative_ms in times:
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((name.strip(), self_ms, cumulative_ms))
+        elif depth == 0:
+            if name.strip() == module:
+                return sorted(children, key=lambda row: row[2], reverse=True)
+            children = []
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=['simpleapp'])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    over_budget = False
+    for module in args.modules:
+        times = import_times(module)
+        total_ms = next(cumulative for name, _, cumulative in times if name.strip() == module)
+        print(f'{module}: {total_ms:.0f} ms cumulative (budget {args.budget_ms:.0f} ms)')
+        print(f"  {'module':<40} {'self ms':>9} {'cumul ms':>9}")
+        for name, self_ms, cumulative_ms in direct_imports(times, module)[:args.top]:
+            print(f'  {name:<40} {self_ms:>9.1f} {cumulative_ms:>9.1f}')
+        if total_ms > args.budget_ms:
+            print(f'  OVER BUDGET by {total_ms - args.budget_ms:.0f} ms')
+            over_budget = True
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
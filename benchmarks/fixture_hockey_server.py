@@ -0,0 +1,117 @@
+"""Local stand-in for the paginated hockey-teams listing crawled by web_scrapping.py.
+
+Usage: python benchmarks/fixture_hockey_server.py [--serve] [port]
+
+Without --serve, the stand-in is started on a free port and crawled once with
+crawl_teams() (through an empty temporary HTTP cache), reporting the pages and
+rows fetched, the requests served, the peak number of requests in flight and
+the wall time. With --serve it just serves the pages; point the app at it with
+
+    HOCKEY_URL=http://127.0.0.1:<port>/pages/forms/?page_num=1 streamlit run web_scrapping.py
+
+Like the real site, each page links only to its nearby pages and the next one,
+so the crawler has to discover the listing as it goes.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+PAGES = 24
+TEAMS_PER_PAGE = 25
+PAGE_DELAY = 0.1  # seconds to serve each page
+LINK_WINDOW = 5  # pages linked on either side of the current one
+
+
+def team_page(n):
+    rows = ''.join(
+        f'<tr class="team"><td class="name">Team {n}-{i}</td><td class="year">{1990 + n}</td>'
+        f'<td class="wins">{i}</td><td class="losses">{TEAMS_PER_PAGE - i}</td></tr>'
+        for i in range(TEAMS_PER_PAGE)
+    )
+    links = ''.join(
+        f'<li><a href="/pages/forms/?page_num={k}">{k}</a></li>'
+        for k in range(max(1, n - LINK_WINDOW), min(PAGES, n + LINK_WINDOW) + 1)
+    )
+    if n < PAGES:
+        links += f'<li><a href="/pages/forms/?page_num={n + 1}" aria-label="Next">&raquo;</a></li>'
+    return (
+        '<html><body><table class="table"><tr><th>Team Name</th><th>Year</th><th>Wins</th><th>Losses</th></tr>'
+        f'{rows}</table><ul class="pagination">{links}</ul></body></html>'
+    )
+
+
+class HockeyHandler(BaseHTTPRequestHandler):
+    stats = None  # per server, see start()
+    lock = None
+
+    def do_GET(self):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['in_flight'] += 1
+            self.stats['peak'] = max(self.stats['peak'], self.stats['in_flight'])
+        try:
+            time.sleep(PAGE_DELAY)
+            n = int(parse_qs(urlparse(self.path).query).get('page_num', ['1'])[0])
+            body = team_page(n).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with self.lock:
+                self.stats['in_flight'] -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port=0):
+    """Serve on a background thread; server.stats counts what this server has seen"""
+    stats = {'requests': 0, 'in_flight': 0, 'peak': 0}
+    handler = type(HockeyHandler.__name__, (HockeyHandler,), {'stats': stats, 'lock': threading.Lock()})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_url(server):
+    return f'http://127.0.0.1:{server.server_port}/pages/forms/?page_num=1'
+
+
+def main():
+    server = start()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # An empty cache, so every page is really fetched
+        os.environ['SCRAPER_CACHE_DIR'] = cache_dir
+        from web_scrapping import MAX_CONCURRENT_PAGES, crawl_teams
+
+        start_time = time.perf_counter()
+        pages = rows = 0
+        for _, teams in crawl_teams(start_url(server)):
+            pages += 1
+            rows += len(teams['Team Name'])
+        elapsed = time.perf_counter() - start_time
+    server.shutdown()
+
+    stats = server.stats
+    print(f'pages: {pages}/{PAGES}  rows: {rows}  requests: {stats["requests"]}  '
+          f'peak in flight: {stats["peak"]} (limit {MAX_CONCURRENT_PAGES})  time: {elapsed:.2f}s')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--serve']:
+        server = start(int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
+        print(f'HOCKEY_URL={start_url(server)}')
+        threading.Event().wait()
+    else:
+        main()
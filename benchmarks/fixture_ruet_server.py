@@ -0,0 +1,125 @@
+"""Local stand-in for the RUET department teacher_list pages scraped by web_scrapping4.py.
+
+Usage: python benchmarks/fixture_ruet_server.py [--serve] [port]
+
+Without --serve, the stand-in is started on a free port and every department is
+loaded once with get_all_data() (through an empty temporary cache and snapshot
+store), reporting the departments and teachers loaded, the requests served,
+the 503s that had to be retried, and the wall time. With --serve it just serves
+the pages; point the app at it with
+
+    RUET_URL_TEMPLATE=http://127.0.0.1:<port>/{dept}/teacher_list streamlit run web_scrapping4.py
+
+Pages carry an ETag and answer a matching If-None-Match with 304, and the first
+requests for the FLAKY_DEPTS fail with 503 so the retry path is exercised.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+TEACHERS_PER_DEPT = 40
+PAGE_DELAY = 0.3  # seconds to serve each page
+FLAKY_DEPTS = {'cse', 'math'}
+FAILURES_PER_FLAKY_DEPT = 1
+DESIGNATIONS = ['Professor', 'Assistant Professor', 'Associate Professor', 'Lecturer', 'Senior Lecturer', 'Instructor']
+
+
+def teacher_page(dept):
+    rows = ''.join(
+        f'<tr><td>{i}</td><td>Teacher {dept.upper()} {i}</td><td>শিক্ষক {i}</td><td>{DESIGNATIONS[i % 6]}</td>'
+        f'<td>{dept.upper()}</td><td>teacher{i}@{dept}.ruet.ac.bd</td><td>+880{i:08d}</td></tr>'
+        for i in range(TEACHERS_PER_DEPT)
+    )
+    return (
+        '<html><body><table><tr><th>#</th><th>Name</th><th>Name (BN)</th><th>Designation</th>'
+        f'<th>Department</th><th>Email</th><th>Phone</th></tr>{rows}</table></body></html>'
+    )
+
+
+class RuetHandler(BaseHTTPRequestHandler):
+    stats = None  # per server, see start()
+    lock = None
+
+    def do_GET(self):
+        dept = self.path.strip('/').split('/')[0].lower()
+        with self.lock:
+            self.stats['requests'] += 1
+            fail = dept in FLAKY_DEPTS and self.stats['failed'].get(dept, 0) < FAILURES_PER_FLAKY_DEPT
+            if fail:
+                self.stats['failed'][dept] = self.stats['failed'].get(dept, 0) + 1
+        if fail:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        time.sleep(PAGE_DELAY)
+        etag = f'"v1-{dept}"'
+        if self.headers.get('If-None-Match') == etag:
+            with self.lock:
+                self.stats['not_modified'] += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = teacher_page(dept).encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port=0):
+    """Serve on a background thread; server.stats counts what this server has seen"""
+    stats = {'requests': 0, 'failed': {}, 'not_modified': 0}
+    handler = type(RuetHandler.__name__, (RuetHandler,), {'stats': stats, 'lock': threading.Lock()})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def url_template(server):
+    return f'http://127.0.0.1:{server.server_port}/{{dept}}/teacher_list'
+
+
+def main():
+    server = start()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # An empty cache and snapshot store, so every department is really fetched
+        os.environ['RUET_URL_TEMPLATE'] = url_template(server)
+        os.environ['SCRAPER_CACHE_DIR'] = cache_dir
+        os.environ['SCRAPER_SNAPSHOT_DB'] = str(Path(cache_dir) / 'snapshots.sqlite')
+        from web_scrapping4 import DEPTS, DESIGNATIONS as ALL_DESIGNATIONS, get_all_data
+
+        start_time = time.perf_counter()
+        data, errors = get_all_data(ALL_DESIGNATIONS)
+        elapsed = time.perf_counter() - start_time
+    server.shutdown()
+
+    stats = server.stats
+    print(f'departments: {len(DEPTS) - len(errors)}/{len(DEPTS)}  teachers: {len(data)}  '
+          f'requests: {stats["requests"]}  retried 503s: {sum(stats["failed"].values())}  time: {elapsed:.2f}s')
+    for dept, error in errors.items():
+        print(f'{dept}: {error}')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--serve']:
+        server = start(int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
+        print(f'RUET_URL_TEMPLATE={url_template(server)}')
+        threading.Event().wait()
+    else:
+        main()
@@ -0,0 +1,294 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+import streamlit as st
+
+
+RECORD_STORE_DIR = Path(os.environ.get('THYROID_RECORD_DIR', 'patient_records'))
+RECORD_LOG_FILE = 'records.log'
+RECORD_DB_FILE = 'records.sqlite'
+
+GROUP_COMMIT_MAX_RECORDS = 1024
+GROUP_COMMIT_MAX_WAIT = 0.0  # extra seconds to linger for submissions; batches also form while the last fsync runs
+COMPACT_EVERY_RECORDS = 10000
+
+
+class RecordLog:
+    """Append-only JSONL log compacted into SQLite; one writer thread fsyncs each batch of concurrent submissions once"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS records (
+            seq INTEGER PRIMARY KEY,
+            patient_id TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS records_patient ON records (patient_id);
+    """
+
+    def __init__(self, store_dir=RECORD_STORE_DIR, max_batch=GROUP_COMMIT_MAX_RECORDS,
+                 max_wait=GROUP_COMMIT_MAX_WAIT, compact_every=COMPACT_EVERY_RECORDS, fsync=True):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.store_dir / RECORD_LOG_FILE
+        self.db_path = self.store_dir / RECORD_DB_FILE
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.compact_every = compact_every
+        self.fsync = fsync
+
+        self.queue = []
+        self.ready = threading.Condition()
+        self.io_lock = threading.Lock()
+        self.compact_lock = threading.Lock()
+        self.closed = False
+        self.commits = 0
+        self.committed = 0
+
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(self.SCHEMA)
+            compacted = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM records').fetchone()[0]
+
+        # A log left behind by a crash mid-compaction is folded in before accepting writes, and a
+        # torn final line is cut off so new appends do not land behind it
+        self._fold(self.log_path.with_suffix('.compacting'))
+        logged = self._read_log(self.log_path, truncate=True)
+        self.seq = max([compacted] + [entry['seq'] for entry in logged])
+        self.pending = len(logged)
+        self.log = open(self.log_path, 'ab')
+        self._sync_dir()
+
+        self.writer = threading.Thread(target=self._run, name='record-log-writer', daemon=True)
+        self.writer.start()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def append(self, records):
+        """Queue records for the next group commit; the returned future resolves to their sequence numbers"""
+        future = Future()
+        with self.ready:
+            if self.closed:
+                raise RuntimeError('record log is closed')
+            self.queue.append((list(records), future))
+            self.ready.notify()
+        return future
+
+    def submit(self, records, timeout=None):
+        """Append records and wait until they are durable on disk"""
+        return self.append(records).result(timeout)
+
+    def _run(self):
+        while True:
+            with self.ready:
+                while not self.queue and not self.closed:
+                    self.ready.wait()
+                if not self.queue:
+                    return
+                # Linger briefly so submissions arriving together share one fsync
+                deadline = time.monotonic() + self.max_wait
+                while sum(len(records) for records, _ in self.queue) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self.closed:
+                        break
+                    self.ready.wait(remaining)
+                taken = size = 0
+                for records, _ in self.queue:
+                    if taken and size + len(records) > self.max_batch:
+                        break
+                    taken += 1
+                    size += len(records)
+                batch, self.queue = self.queue[:taken], self.queue[taken:]
+            self._commit(batch)
+
+    def _commit(self, batch):
+        lines = []
+        assigned = []
+        for records, _ in batch:
+            seqs = list(range(self.seq + 1, self.seq + len(records) + 1))
+            self.seq += len(records)
+            lines.extend(
+                json.dumps({'seq': seq, 'record': record}, ensure_ascii=False).encode('utf-8') + b'\n'
+                for seq, record in zip(seqs, records)
+            )
+            assigned.append(seqs)
+        with self.io_lock:
+            start = os.fstat(self.log.fileno()).st_size
+            try:
+                self.log.write(b''.join(lines))
+                self.log.flush()
+                if self.fsync:
+                    os.fsync(self.log.fileno())
+            except OSError as e:
+                self._rollback(start)
+                self.seq -= len(lines)
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+            self.pending += len(lines)
+            pending = self.pending
+        self.commits += 1
+        self.committed += len(lines)
+        for (_, future), seqs in zip(batch, assigned):
+            future.set_result(seqs)
+        if pending >= self.compact_every and not self.compact_lock.locked():
+            threading.Thread(target=self.compact, name='record-log-compactor', daemon=True).start()
+
+    def _sync_dir(self):
+        """Fsync store_dir so a created or renamed log survives a power loss along with its fsynced contents"""
+        if not self.fsync or os.name == 'nt':  # directories cannot be opened for fsync on Windows
+            return
+        fd = os.open(self.store_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _rollback(self, size):
+        """Cut the log back to size after a failed write, so no partial line is left behind"""
+        try:
+            self.log.close()
+        except OSError:
+            pass
+        os.truncate(self.log_path, size)
+        self.log = open(self.log_path, 'ab')
+
+    @staticmethod
+    def _read_log(path, truncate=False):
+        """Parse a log file up to the last complete line; with truncate, cut off anything after it"""
+        if not path.exists():
+            return []
+        entries = []
+        valid = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+                valid += len(line)
+        if truncate and valid < path.stat().st_size:
+            os.truncate(path, valid)
+        return entries
+
+    def _fold(self, path):
+        entries = self._read_log(path)
+        if entries:
+            with self._connect() as conn:
+                conn.executemany(
+                    'INSERT OR IGNORE INTO records (seq, patient_id, data) VALUES (?, ?, ?)',
+                    [(entry['seq'], entry['record'].get('PatientID'), json.dumps(entry['record'], ensure_ascii=False))
+                     for entry in entries]
+                )
+        path.unlink(missing_ok=True)
+        return len(entries)
+
+    def compact(self):
+        """Rotate the log and fold the rotated segment into SQLite; writers only pause for the rename"""
+        with self.compact_lock:
+            segment = self.log_path.with_suffix('.compacting')
+            if segment.exists():
+                self._fold(segment)  # left over from a failed run; never overwrite it
+            with self.io_lock:
+                self.log.close()
+                os.replace(self.log_path, segment)
+                self.log = open(self.log_path, 'ab')
+                # Before any commit is acknowledged from the new log, both directory entries are durable
+                self._sync_dir()
+                rotated, self.pending = self.pending, 0
+            try:
+                return self._fold(segment)
+            except Exception:
+                with self.io_lock:
+                    self.pending += rotated
+                raise
+
+    @staticmethod
+    def _tail(f, size, limit=None, block=1 << 16):
+        """Parse the last `limit` complete lines (all for None) of the first `size` bytes of f, oldest first"""
+        if limit is None:
+            f.seek(0)
+            data = f.read(size)
+        else:
+            # Read backwards a block at a time until enough lines are in hand
+            data = b''
+            pos = size
+            while pos > 0 and data.count(b'\n') <= limit:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+            if pos > 0:
+                data = data[data.index(b'\n') + 1:]  # the first line is cut off
+        lines = data[:data.rfind(b'\n') + 1].splitlines()
+        if limit is not None:
+            lines = lines[-limit:] if limit else []
+        return [json.loads(line) for line in lines]
+
+    def records(self, limit=None):
+        """Most recent records first, from the live log tail and then the compacted table"""
+        # Only the handles and committed sizes are taken under the lock, so readers never stall the writer;
+        # the handles stay readable if compaction renames or removes the files meanwhile
+        handles = []
+        with self.io_lock:
+            for path in (self.log_path, self.log_path.with_suffix('.compacting')):
+                try:
+                    f = open(path, 'rb')
+                except FileNotFoundError:
+                    continue
+                handles.append((f, os.fstat(f.fileno()).st_size))
+            last_seq = self.seq
+        tail = []
+        try:
+            for f, size in handles:
+                if limit is not None and len(tail) >= limit:
+                    break
+                tail = self._tail(f, size, None if limit is None else limit - len(tail)) + tail
+        finally:
+            for f, _ in handles:
+                f.close()
+        if limit is not None and len(tail) >= limit:
+            return [entry['record'] for entry in reversed(tail)]
+
+        # A segment may be mid-fold, so only take table rows older than the oldest logged one
+        before = tail[0]['seq'] if tail else last_seq + 1
+        tail = [entry['record'] for entry in reversed(tail)]
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT data FROM records WHERE seq < ? ORDER BY seq DESC LIMIT ?',
+                (before, -1 if limit is None else limit - len(tail))
+            ).fetchall()
+        return tail + [json.loads(data) for (data,) in rows]
+
+    def count(self):
+        with self._connect() as conn:
+            compacted = conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+        return compacted + self.pending
+
+    def close(self):
+        """Drain the queue, stop the writer and close the log"""
+        with self.ready:
+            self.closed = True
+            self.ready.notify()
+        self.writer.join()
+        with self.io_lock:
+            self.log.close()
+
+
+@st.cache_resource
+def get_record_log(store_dir=RECORD_STORE_DIR):
+    """One writer per process, so every session's submissions join the same group commits"""
+    return RecordLog(store_dir)
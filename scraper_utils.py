@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urljoin
+import streamlit as st
+import pandas as pd
+import requests
+from lxml import etree, html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+REQUEST_TIMEOUT = (5, 20)  # connect, read (seconds)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+POOL_SIZE = 16
+
+CACHE_DIR = Path(os.environ.get('SCRAPER_CACHE_DIR', '.scraper_cache'))
+CACHE_TTL = int(os.environ.get('SCRAPER_CACHE_TTL', '3600'))  # seconds
+SNAPSHOT_DB = Path(os.environ.get('SCRAPER_SNAPSHOT_DB', str(CACHE_DIR / 'snapshots.sqlite')))
+
+
+def make_session(pool_size=POOL_SIZE, retries=MAX_RETRIES, backoff=BACKOFF_FACTOR):
+    """requests session with a connection pool per host and bounded retries with exponential backoff"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET'])
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+@st.cache_resource
+def get_session():
+    """One pooled session shared by every rerun and session of the app"""
+    return make_session()
+
+
+class HTTPCache:
+    """On-disk response cache: fresh entries are served offline, stale ones are revalidated with ETag/Last-Modified"""
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f'{key}.body', self.cache_dir / f'{key}.json'
+
+    def _load(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            return meta, body_path.read_text(encoding='utf-8')
+        except (OSError, ValueError):
+            return None, None
+
+    def _write_atomic(self, path, text):
+        # Sessions are threads of one process, so every writer needs its own temp file
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.cache_dir, suffix='.tmp', delete=False) as tmp:
+            tmp.write(text)
+        os.replace(tmp.name, path)
+
+    def _store(self, url, meta, body=None):
+        body_path, meta_path = self._paths(url)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if body is not None:
+            self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps(meta))
+
+    def fetch(self, url, session=None):
+        """Return (text, digest) for url, touching the network only when the cached copy is stale"""
+        meta, body = self._load(url)
+        if meta is not None and time.time() - meta['fetched_at'] < self.ttl:
+            return body, meta['digest']
+
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        session = session or get_session()
+        response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304 and meta is not None:
+            meta['fetched_at'] = time.time()
+            self._store(url, meta)
+            return body, meta['digest']
+        response.raise_for_status()
+
+        body = response.text
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+            'digest': hashlib.sha256(body.encode('utf-8')).hexdigest(),
+        }
+        self._store(url, meta, body)
+        return body, meta['digest']
+
+
+@st.cache_resource
+def get_http_cache():
+    return HTTPCache()
+
+
+def fetch_cached(url, session=None):
+    """Fetch url through the shared on-disk HTTP cache; returns (text, digest)"""
+    return get_http_cache().fetch(url, session)
+
+
+def extract_table(html, columns, row_xpath='//table//tr', skip_rows=1):
+    """Single pass over the target table's rows; returns {name: list of cell text} for the {name: cell index} columns
+
+    Rows with fewer cells than the largest requested index (e.g. header rows of <th>) are skipped.
+    """
+    data = {name: [] for name in columns}
+    if not html or not html.strip():
+        return data
+    try:
+        rows = lxml_html.fromstring(html).xpath(row_xpath)[skip_rows:]
+    except etree.ParserError:
+        return data
+
+    needed = max(columns.values()) + 1
+    items = list(columns.items())
+    for row in rows:
+        cells = row.findall('td')
+        if len(cells) < needed:
+            continue
+        for name, index in items:
+            data[name].append(cells[index].text_content().strip())
+    return data
+
+
+def page_links(html, base_url, link_xpath):
+    """Absolute URLs of the pagination links matched by link_xpath"""
+    if not html or not html.strip():
+        return []
+    hrefs = lxml_html.fromstring(html).xpath(link_xpath)
+    return [urljoin(base_url, href).split('#')[0] for href in hrefs]
+
+
+def crawl_pages(start_url, parse_page, link_xpath, max_workers=4, session=None):
+    """Follow pagination from start_url with at most max_workers requests in flight
+
+    Yields (url, parse_page(html)) as each page completes, so callers can render partial results.
+    """
+    session = session or get_session()
+    seen = {start_url}
+    pending = deque([start_url])
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        in_flight = {}
+        while pending or in_flight:
+            while pending and len(in_flight) < max_workers:
+                url = pending.popleft()
+                in_flight[pool.submit(fetch_cached, url, session)] = url
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = in_flight.pop(future)
+                html, _ = future.result()
+                for link in page_links(html, url, link_xpath):
+                    if link not in seen:
+                        seen.add(link)
+                        pending.append(link)
+                yield url, parse_page(html)
+
+
+class SnapshotStore:
+    """SQLite store of scraped tables with a content hash per row and an insert/update/delete history"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rows (
+            source TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            row_hash TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (source, row_key)
+        );
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            taken_at TEXT NOT NULL,
+            page_digest TEXT,
+            inserted INTEGER NOT NULL,
+            updated INTEGER NOT NULL,
+            deleted INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS changes (
+            snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+            row_key TEXT NOT NULL,
+            change TEXT NOT NULL,
+            data TEXT
+        );
+        CREATE INDEX IF NOT EXISTS snapshots_source ON snapshots (source, id);
+    """
+
+    def __init__(self, path=SNAPSHOT_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def last_digest(self, source):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT page_digest FROM snapshots WHERE source = ? ORDER BY id DESC LIMIT 1', (source,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def apply(self, source, data, key_columns, page_digest=None):
+        """Diff data against the last snapshot of source and write only the changed rows; returns change counts"""
+        records = data.to_dict(orient='records')
+        payloads = [json.dumps(record, sort_keys=True, ensure_ascii=False) for record in records]
+        keys = ['|'.join(str(record[col]) for col in key_columns) for record in records]
+        new = {
+            key: (hashlib.sha1(payload.encode('utf-8')).hexdigest(), payload)
+            for key, payload in zip(keys, payloads)
+        }
+
+        with self.lock, self._connect() as conn:
+            old = dict(conn.execute('SELECT row_key, row_hash FROM rows WHERE source = ?', (source,)))
+            inserted = [key for key in new if key not in old]
+            updated = [key for key in new if key in old and old[key] != new[key][0]]
+            deleted = [key for key in old if key not in new]
+
+            cursor = conn.execute(
+                'INSERT INTO snapshots (source, taken_at, page_digest, inserted, updated, deleted) VALUES (?, ?, ?, ?, ?, ?)',
+                (source, datetime.now().isoformat(timespec='seconds'), page_digest, len(inserted), len(updated), len(deleted))
+            )
+            snapshot_id = cursor.lastrowid
+            # An upsert keeps an updated row's rowid, and with it the row's place in load()
+            conn.executemany(
+                'INSERT INTO rows (source, row_key, row_hash, data) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (source, row_key) DO UPDATE SET row_hash = excluded.row_hash, data = excluded.data',
+                [(source, key, new[key][0], new[key][1]) for key in inserted + updated]
+            )
+            conn.executemany('DELETE FROM rows WHERE source = ? AND row_key = ?', [(source, key) for key in deleted])
+            conn.executemany(
+                'INSERT INTO changes (snapshot_id, row_key, change, data) VALUES (?, ?, ?, ?)',
+                [(snapshot_id, key, 'insert', new[key][1]) for key in inserted]
+                + [(snapshot_id, key, 'update', new[key][1]) for key in updated]
+                + [(snapshot_id, key, 'delete', None) for key in deleted]
+            )
+        return {'inserted': len(inserted), 'updated': len(updated), 'deleted': len(deleted)}
+
+    def load(self, source):
+        """Current rows of source as a DataFrame"""
+        with self._connect() as conn:
+            payloads = conn.execute('SELECT data FROM rows WHERE source = ? ORDER BY rowid', (source,)).fetchall()
+        return pd.DataFrame([json.loads(payload) for (payload,) in payloads])
+
+    def history(self, source):
+        """One row per snapshot of source, newest first"""
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                'SELECT id, taken_at, inserted, updated, deleted FROM snapshots WHERE source = ? ORDER BY id DESC',
+                conn, params=(source,)
+            )
+
+
+@st.cache_resource
+def get_snapshot_store():
+    return SnapshotStore()
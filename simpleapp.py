@@ -1,14 +1,23 @@
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from html import escape
+from pathlib import Path
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, date
-import plotly.express as px
-import plotly.graph_objects as go
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
+from patient_records import get_record_log
+
+# pyarrow, plotly and scikit-learn are imported inside the functions that use
+# them so that pages which do not need them (e.g. the Main Terminal) start fast.
 
 # Set page configuration
 st.set_page_config(
@@ -19,35 +28,19 @@ st.set_page_config(
 )
 
 # Custom CSS for enhanced retro computer styling
-st.markdown("""
-<style>
+# Web fonts (skipped in lite mode; the monospace fallbacks are used instead)
+FONT_CSS = """
     @import url('https://fonts.googleapis.com/css2?family=Courier+Prime:wght@400;700&family=VT323&display=swap');
-    
+"""
+
+# Static retro styling shared by both render modes
+BASE_CSS = """
     .stApp {
         background: linear-gradient(45deg, #000000 0%, #0a0a0a 25%, #1a1a2e 50%, #16213e 75%, #0f3460 100%);
         font-family: 'VT323', monospace;
         background-attachment: fixed;
     }
     
-    /* Scanlines effect */
-    .stApp::before {
-        content: '';
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        background: repeating-linear-gradient(
-            0deg,
-            rgba(0, 255, 65, 0.03) 0px,
-            rgba(0, 255, 65, 0.03) 1px,
-            transparent 1px,
-            transparent 2px
-        );
-        pointer-events: none;
-        z-index: 1000;
-    }
-    
     .main-header {
         font-size: 3rem;
         color: #00ff41;
@@ -63,22 +56,10 @@ st.markdown("""
         box-shadow: 
             0 0 30px rgba(0, 255, 65, 0.4),
             inset 0 0 20px rgba(0, 255, 65, 0.1);
-        animation: glow 2s ease-in-out infinite alternate;
-    }
-    
-    @keyframes glow {
-        from { box-shadow: 0 0 20px rgba(0, 255, 65, 0.3); }
-        to { box-shadow: 0 0 40px rgba(0, 255, 65, 0.6); }
-    }
-    
-    @keyframes blink {
-        0%, 50% { opacity: 1; }
-        51%, 100% { opacity: 0; }
     }
     
     .blinking-cursor::after {
         content: '█';
-        animation: blink 1s infinite;
         color: #00ff41;
     }
     
@@ -110,22 +91,6 @@ st.markdown("""
         overflow: hidden;
     }
     
-    .retro-terminal::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 2px;
-        background: linear-gradient(90deg, transparent, #00ff41, transparent);
-        animation: scan 3s linear infinite;
-    }
-    
-    @keyframes scan {
-        0% { left: -100%; }
-        100% { left: 100%; }
-    }
-    
     .diagnostic-box {
         background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
         border: 2px solid #ff6b35;
@@ -140,24 +105,6 @@ st.markdown("""
         position: relative;
     }
     
-    .diagnostic-box::after {
-        content: '';
-        position: absolute;
-        top: 5px;
-        right: 5px;
-        width: 8px;
-        height: 8px;
-        background: #ff6b35;
-        border-radius: 50%;
-        animation: pulse 2s infinite;
-    }
-    
-    @keyframes pulse {
-        0% { opacity: 1; transform: scale(1); }
-        50% { opacity: 0.5; transform: scale(1.2); }
-        100% { opacity: 1; transform: scale(1); }
-    }
-    
     .computer-screen {
         background: radial-gradient(ellipse at center, #001100 0%, #000000 100%);
         border: 4px solid #333;
@@ -187,7 +134,6 @@ st.markdown("""
         height: 12px;
         border-radius: 50%;
         margin-right: 8px;
-        animation: pulse 1.5s infinite;
     }
     
     .led-green { background: #00ff41; box-shadow: 0 0 10px #00ff41; }
@@ -254,22 +200,6 @@ st.markdown("""
         overflow: hidden;
     }
     
-    .progress-fill::after {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.3), transparent);
-        animation: shine 2s infinite;
-    }
-    
-    @keyframes shine {
-        0% { left: -100%; }
-        100% { left: 100%; }
-    }
-    
     .matrix-bg {
         position: fixed;
         top: 0;
@@ -298,44 +228,1277 @@ st.markdown("""
         color: #00ff41 !important;
         border: 1px solid #333 !important;
     }
-</style>
-""", unsafe_allow_html=True)
+"""
+
+# Animated layers: scanline overlay, glow, scan, pulse, shine and blink
+MOTION_CSS = """
+    /* Scanlines effect */
+    .stApp::before {
+        content: '';
+        position: fixed;
+        top: 0;
+        left: 0;
+        width: 100%;
+        height: 100%;
+        background: repeating-linear-gradient(
+            0deg,
+            rgba(0, 255, 65, 0.03) 0px,
+            rgba(0, 255, 65, 0.03) 1px,
+            transparent 1px,
+            transparent 2px
+        );
+        pointer-events: none;
+        z-index: 1000;
+    }
+    
+    .main-header {
+        animation: glow 2s ease-in-out infinite alternate;
+    }
+    
+    @keyframes glow {
+        from { box-shadow: 0 0 20px rgba(0, 255, 65, 0.3); }
+        to { box-shadow: 0 0 40px rgba(0, 255, 65, 0.6); }
+    }
+    
+    @keyframes blink {
+        0%, 50% { opacity: 1; }
+        51%, 100% { opacity: 0; }
+    }
+    
+    .blinking-cursor::after {
+        animation: blink 1s infinite;
+    }
+    
+    .retro-terminal::before {
+        content: '';
+        position: absolute;
+        top: 0;
+        left: -100%;
+        width: 100%;
+        height: 2px;
+        background: linear-gradient(90deg, transparent, #00ff41, transparent);
+        animation: scan 3s linear infinite;
+    }
+    
+    @keyframes scan {
+        0% { left: -100%; }
+        100% { left: 100%; }
+    }
+    
+    .diagnostic-box::after {
+        content: '';
+        position: absolute;
+        top: 5px;
+        right: 5px;
+        width: 8px;
+        height: 8px;
+        background: #ff6b35;
+        border-radius: 50%;
+        animation: pulse 2s infinite;
+    }
+    
+    @keyframes pulse {
+        0% { opacity: 1; transform: scale(1); }
+        50% { opacity: 0.5; transform: scale(1.2); }
+        100% { opacity: 1; transform: scale(1); }
+    }
+    
+    .status-led {
+        animation: pulse 1.5s infinite;
+    }
+    
+    .progress-fill::after {
+        content: '';
+        position: absolute;
+        top: 0;
+        left: -100%;
+        width: 100%;
+        height: 100%;
+        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.3), transparent);
+        animation: shine 2s infinite;
+    }
+    
+    @keyframes shine {
+        0% { left: -100%; }
+        100% { left: 100%; }
+    }
+"""
+
+# Clients that ask for reduced motion get the static look even in full mode
+REDUCED_MOTION_CSS = """
+    @media (prefers-reduced-motion: reduce) {
+        .stApp::before,
+        .retro-terminal::before,
+        .diagnostic-box::after,
+        .progress-fill::after {
+            display: none;
+        }
+        
+        *, *::before, *::after {
+            animation: none !important;
+            transition: none !important;
+        }
+    }
+"""
+
+def build_stylesheet(lite=False):
+    """Global stylesheet; lite mode drops web fonts and every animated layer"""
+    if lite:
+        return f"<style>{BASE_CSS}</style>"
+    return f"<style>{FONT_CSS}{BASE_CSS}{MOTION_CSS}{REDUCED_MOTION_CSS}</style>"
+
+# Lite rendering is chosen per session (or with ?lite=1 in the URL)
+lite_mode = st.sidebar.toggle(
+    "⚡ Lite rendering",
+    value=st.query_params.get("lite") == "1",
+    key="lite_mode",
+    help="Static styling without animations or web fonts, for thin clients and kiosks"
+)
+st.markdown(build_stylesheet(lite_mode), unsafe_allow_html=True)
 
-def generate_thyroid_data():
+# Vectorized diagnosis and risk scoring
+TSH_NORMAL_RANGE = (0.4, 4.0)
+RISK_COLORS = {'Low': '#00ff41', 'Medium': '#ff6b35', 'High': '#ff4444'}
+SCREENING_SYMPTOM_COLUMNS = ['Fatigue', 'Weight_Changes', 'Heart_Rate', 'Temperature']
+SCREENING_HISTORY_WEIGHTS = {
+    'Family_History': 2,
+    'Previous_Thyroid': 3,
+    'Autoimmune': 2,
+    'Smoking': 1,
+    'Radiation': 2,
+    'Pregnancy': 1,
+}
+
+# Declarative lab file schema: column type, physiologic bounds (outside = invalid entry) and
+# reference range (outside = abnormal result); columns a file does not have are skipped
+THYROID_COLUMNS = ['TSH', 'T3', 'T4', 'T4U', 'FTI']
+LAB_FLAG_VALUES = ['yes', 'no', 'true', 'false', 'y', 'n', '1', '0']
+LAB_SCHEMA = {
+    'PatientID': {'type': 'id', 'pattern': r'THY-\d{4}'},
+    'Age': {'type': 'int', 'bounds': (0, 120)},
+    'Gender': {'type': 'category', 'values': ['Female', 'Male']},
+    'TSH': {'type': 'float', 'unit': 'mIU/L', 'bounds': (0.0, 500.0), 'reference': TSH_NORMAL_RANGE},
+    'T3': {'type': 'float', 'unit': 'ng/dL', 'bounds': (0.0, 20.0), 'reference': (0.8, 2.8)},
+    'T4': {'type': 'float', 'unit': 'μg/dL', 'bounds': (0.0, 50.0), 'reference': (4.5, 12.0)},
+    'T4U': {'type': 'float', 'unit': 'ratio', 'bounds': (0.0, 5.0), 'reference': (0.8, 1.2)},
+    'FTI': {'type': 'float', 'unit': 'index', 'bounds': (0.0, 100.0), 'reference': (4.5, 12.0)},
+    'Goitre': {'type': 'flag'},
+    'Tumor': {'type': 'flag'},
+    'Hypopituitary': {'type': 'flag'},
+    'Psych': {'type': 'flag'},
+}
+
+def reference_label(col):
+    """Reference range of a lab column as displayed to clinicians, e.g. '0.4-4.0'"""
+    low, high = LAB_SCHEMA[col]['reference']
+    return f"{low}-{high}"
+
+def _yes(df, col):
+    """Boolean mask for a Yes/No or boolean column; missing columns count as No"""
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    values = df[col]
+    if values.dtype == bool:
+        return values.to_numpy()
+    return values.astype(str).str.strip().str.lower().isin(['yes', 'true', '1', 'y']).to_numpy()
+
+def diagnose_tsh(tsh):
+    """Label TSH values as Hyperthyroid, Hypothyroid or Normal"""
+    tsh = np.asarray(tsh, dtype='float64')
+    return np.select(
+        [tsh < TSH_NORMAL_RANGE[0], tsh > TSH_NORMAL_RANGE[1]],
+        ['Hyperthyroid', 'Hypothyroid'],
+        default='Normal'
+    )
+
+def score_lab_results(df):
+    """Score lab results column-wise: diagnosis, risk score (0-7) and risk level"""
+    tsh = pd.to_numeric(df['TSH'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    age = pd.to_numeric(df['Age'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan) if 'Age' in df.columns else np.zeros(len(df))
+    abnormal = (tsh < TSH_NORMAL_RANGE[0]) | (tsh > TSH_NORMAL_RANGE[1])
+    
+    risk_score = (
+        2 * abnormal.astype(np.int8)
+        + _yes(df, 'Goitre')
+        + 2 * _yes(df, 'Tumor')
+        + (age > 60)
+        + _yes(df, 'Psych')
+    ).astype(np.int8)
+    
+    return pd.DataFrame({
+        'Diagnosis': diagnose_tsh(tsh),
+        'Risk_Score': risk_score,
+        'Risk_Level': np.select([risk_score >= 4, risk_score >= 2], ['High', 'Medium'], default='Low'),
+    }, index=df.index)
+
+def score_screening(df):
+    """Score screening questionnaires column-wise: lab flag, risk score (0-18) and risk level"""
+    risk_score = np.zeros(len(df), dtype=np.int8)
+    for col, weight in SCREENING_HISTORY_WEIGHTS.items():
+        risk_score += weight * _yes(df, col)
+    if 'Fatigue' in df.columns:
+        risk_score += df['Fatigue'].isin(['Moderate', 'Severe']).to_numpy()
+    for col in SCREENING_SYMPTOM_COLUMNS[1:]:
+        if col in df.columns:
+            risk_score += (df[col].fillna('No') != 'No').to_numpy()
+    
+    # Lab-based assessment: a missing TSH is not abnormal, but a reading of 0 is a (suppressed) result, as in LAB_SCHEMA
+    if 'TSH' in df.columns:
+        tsh = pd.to_numeric(df['TSH'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    else:
+        tsh = np.full(len(df), np.nan)
+    lab_abnormal = (tsh < TSH_NORMAL_RANGE[0]) | (tsh > TSH_NORMAL_RANGE[1])
+    risk_score += 3 * lab_abnormal
+    
+    return pd.DataFrame({
+        'Lab_Abnormal': lab_abnormal,
+        'Risk_Score': risk_score,
+        'Risk_Level': np.select([risk_score >= 8, risk_score >= 4], ['High', 'Medium'], default='Low'),
+    }, index=df.index)
+
+# Canonical compact dtypes for patient frames; IDs are stored as integers and rendered as THY-XXXX on demand
+PATIENT_ID_PREFIX = "THY-"
+PATIENT_ID_FORMAT = PATIENT_ID_PREFIX + "%04d"
+PATIENT_FLAG_COLUMNS = ['Goitre', 'Tumor', 'Hypopituitary', 'Psych']
+PATIENT_CATEGORIES = {
+    'Gender': ['Female', 'Male'],
+    'Diagnosis': ['Normal', 'Hypothyroid', 'Hyperthyroid'],
+    'Risk_Level': ['Low', 'Medium', 'High'],
+}
+PATIENT_DTYPES = {
+    'PatientID': 'int32',
+    'Age': 'int8',
+    'Risk_Score': 'int8',
+    **{col: 'float32' for col in THYROID_COLUMNS},
+    **{col: 'bool' for col in PATIENT_FLAG_COLUMNS},
+    **{col: pd.CategoricalDtype(values) for col, values in PATIENT_CATEGORIES.items()},
+}
+PATIENT_COLUMN_CONFIG = {'PatientID': st.column_config.NumberColumn("PatientID", format=PATIENT_ID_FORMAT)}
+
+def patient_column_config(df):
+    """THY-XXXX display for integer-encoded IDs; IDs kept as text are shown as they are"""
+    ids = df['PatientID'] if 'PatientID' in df.columns else None
+    return PATIENT_COLUMN_CONFIG if ids is not None and pd.api.types.is_integer_dtype(ids) else None
+
+def format_patient_ids(ids):
+    """Render integer patient IDs as THY-XXXX strings; anything else is passed through as text"""
+    ids = pd.Series(ids)
+    if not pd.api.types.is_integer_dtype(ids):
+        return ids.astype(str)
+    return PATIENT_ID_PREFIX + ids.astype(str).str.zfill(4)
+
+def render_patient_ids(df):
+    """Copy of a frame with PatientID rendered for text exports"""
+    if 'PatientID' not in df.columns:
+        return df
+    return df.assign(PatientID=format_patient_ids(df['PatientID']).to_numpy())
+
+def _patient_numbers(values):
+    """Numeric view of a column"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values
+    return pd.to_numeric(values.astype(str).str.strip(), errors='coerce')
+
+def _patient_ids(values):
+    """THY-XXXX IDs as int32 when every present value is exactly in that form; otherwise the IDs as text
+    
+    Anything looser (THY-001, THY-1e3, a bare number) would not render back to the same ID, so it is kept verbatim.
+    """
+    present = values.notna()
+    text = values[present].astype(str)
+    if not text.str.fullmatch(LAB_SCHEMA['PatientID']['pattern']).all():
+        if pd.api.types.is_float_dtype(values) and (values[present] == values[present].round()).all():
+            values = values.astype('Int64')  # whole numbers that only read as floats because of blanks
+        return values.astype('str') if pd.api.types.is_numeric_dtype(values) else values
+    numbers = pd.to_numeric(text.str.removeprefix(PATIENT_ID_PREFIX)).reindex(values.index)
+    return numbers.astype('int32' if present.all() else 'Int32')
+
+def compact_patient_frame(df):
+    """Cast known patient columns to PATIENT_DTYPES, leaving a column as-is when its values do not fit"""
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        dtype = PATIENT_DTYPES.get(col)
+        present = values.notna()
+        if dtype is None or values.dtype == dtype:
+            out[col] = values
+        elif col == 'PatientID':
+            out[col] = _patient_ids(values)
+        elif isinstance(dtype, pd.CategoricalDtype):
+            known = values[present].isin(dtype.categories).all()
+            out[col] = values.astype(dtype if known else 'category')
+        elif dtype == 'bool':
+            text = values[present].astype(str).str.strip().str.lower()
+            flags = pd.Series(_yes(df, col), index=df.index)
+            if not text.isin(LAB_FLAG_VALUES).all():
+                out[col] = values
+            else:
+                out[col] = flags if present.all() else flags.astype('boolean').where(present)
+        else:
+            numbers = _patient_numbers(values)
+            if numbers.notna().sum() != present.sum():
+                out[col] = values  # some values did not parse; keep the original text
+            elif dtype == 'float32':
+                out[col] = numbers.astype('float32')
+            else:
+                info = np.iinfo(dtype)
+                valid = numbers[present]
+                fits = (valid == valid.round()).all() and valid.between(info.min, info.max).all()
+                out[col] = numbers.astype(dtype if present.all() else dtype.capitalize()) if fits else values
+    return pd.DataFrame(out, index=df.index)
+
+def generate_thyroid_data(seed=42, n_samples=500):
     """Generate sample thyroid patient data for demonstrations"""
-    np.random.seed(42)
-    n_samples = 500
+    rng = np.random.RandomState(seed)
     
     # Generate realistic thyroid data
     data = {
-        'PatientID': [f'THY-{i:04d}' for i in range(1, n_samples + 1)],
-        'Age': np.random.normal(45, 15, n_samples).astype(int).clip(18, 80),
-        'TSH': np.random.lognormal(0.5, 0.8, n_samples).clip(0.1, 50),
-        'T3': np.random.normal(1.8, 0.4, n_samples).clip(0.5, 4.0),
-        'T4': np.random.normal(9.5, 2.0, n_samples).clip(4.0, 18.0),
-        'T4U': np.random.normal(1.0, 0.15, n_samples).clip(0.6, 1.5),
-        'FTI': np.random.normal(9.5, 2.2, n_samples).clip(4.0, 18.0),
-        'Gender': np.random.choice(['Male', 'Female'], n_samples, p=[0.3, 0.7]),
-        'Goitre': np.random.choice(['Yes', 'No'], n_samples, p=[0.2, 0.8]),
-        'Tumor': np.random.choice(['Yes', 'No'], n_samples, p=[0.1, 0.9]),
-        'Hypopituitary': np.random.choice(['Yes', 'No'], n_samples, p=[0.05, 0.95]),
-        'Psych': np.random.choice(['Yes', 'No'], n_samples, p=[0.15, 0.85]),
+        'PatientID': np.arange(1, n_samples + 1, dtype='int32'),
+        'Age': rng.normal(45, 15, n_samples).astype(int).clip(18, 80),
+        'TSH': rng.lognormal(0.5, 0.8, n_samples).clip(0.1, 50),
+        'T3': rng.normal(1.8, 0.4, n_samples).clip(0.5, 4.0),
+        'T4': rng.normal(9.5, 2.0, n_samples).clip(4.0, 18.0),
+        'T4U': rng.normal(1.0, 0.15, n_samples).clip(0.6, 1.5),
+        'FTI': rng.normal(9.5, 2.2, n_samples).clip(4.0, 18.0),
+        'Gender': rng.choice(['Male', 'Female'], n_samples, p=[0.3, 0.7]),
+        'Goitre': rng.choice(['Yes', 'No'], n_samples, p=[0.2, 0.8]),
+        'Tumor': rng.choice(['Yes', 'No'], n_samples, p=[0.1, 0.9]),
+        'Hypopituitary': rng.choice(['Yes', 'No'], n_samples, p=[0.05, 0.95]),
+        'Psych': rng.choice(['Yes', 'No'], n_samples, p=[0.15, 0.85]),
     }
     
-    # Generate diagnosis based on TSH levels (simplified)
-    diagnosis = []
-    for tsh in data['TSH']:
-        if tsh < 0.4:
-            diagnosis.append('Hyperthyroid')
-        elif tsh > 4.0:
-            diagnosis.append('Hypothyroid')
-        else:
-            diagnosis.append('Normal')
+    df = pd.DataFrame(data)
+    
+    # Diagnosis and risk come from the shared scoring engine
+    scores = score_lab_results(df)
+    df['Diagnosis'] = scores['Diagnosis']
+    df['Risk_Score'] = scores['Risk_Score']
+    df['Risk_Level'] = scores['Risk_Level']
+    
+    return compact_patient_frame(df)
+
+@st.cache_data(show_spinner=False)
+def load_thyroid_cohort(seed=42, n_samples=500):
+    """Return the synthetic cohort, generated once per (seed, size) and shared across reruns and sessions"""
+    return generate_thyroid_data(seed, n_samples)
+
+# Columnar patient store (Parquet on local disk, memory-mapped on read)
+PATIENT_STORE_DIR = Path(os.environ.get("THYROID_STORE_DIR", "patient_store"))
+PATIENT_STORE_ROWS = int(os.environ.get("THYROID_STORE_ROWS", "500"))
+PATIENT_STORE_ROW_GROUP = 65536
+PATIENT_STORE_FILE = "patients.parquet"
+PATIENT_STORE_META = "meta.json"
+PATIENT_STORE_SCHEMA = 2  # bumped when the stored dtypes change; older stores are rebuilt
+
+def build_patient_store(df, store_dir=PATIENT_STORE_DIR):
+    """Write a patient frame to the columnar store, sorted by Age so range filters can skip row groups"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    df = df.sort_values('Age', kind='stable', ignore_index=True)
+    
+    tmp_path = store_dir / (PATIENT_STORE_FILE + ".tmp")
+    pq.write_table(
+        pa.Table.from_pandas(df, preserve_index=False),
+        tmp_path,
+        row_group_size=PATIENT_STORE_ROW_GROUP,
+        write_statistics=True
+    )
+    os.replace(tmp_path, store_dir / PATIENT_STORE_FILE)
+    
+    # Small sidecar so the page can draw its filters without scanning the data
+    meta = {
+        'version': datetime.now().strftime('%Y%m%d%H%M%S%f'),
+        'schema': PATIENT_STORE_SCHEMA,
+        'rows': int(len(df)),
+        'age_min': int(df['Age'].min()),
+        'age_max': int(df['Age'].max()),
+        'categories': {col: sorted(df[col].unique().tolist()) for col in ['Gender', 'Diagnosis', 'Risk_Level']},
+    }
+    (store_dir / PATIENT_STORE_META).write_text(json.dumps(meta))
     
-    data['Diagnosis'] = diagnosis
-    data['Risk_Level'] = np.random.choice(['Low', 'Medium', 'High'], n_samples, p=[0.6, 0.3, 0.1])
+    # A rebuild is a fresh ingest of the whole frame plus the durable registrations;
+    # later batches are folded in incrementally
+    metrics = PatientMetrics(store_dir / PATIENT_METRICS_FILE)
+    metrics.backfill([df, *registration_batches()], source="Initial load")
+    return meta
+
+@st.cache_resource(show_spinner="Building patient store...")
+def ensure_patient_store(store_dir=PATIENT_STORE_DIR, n_samples=PATIENT_STORE_ROWS):
+    """Return the store metadata, seeding the store from the synthetic cohort on first use"""
+    meta_path = Path(store_dir) / PATIENT_STORE_META
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+    if meta.get('schema') == PATIENT_STORE_SCHEMA and (Path(store_dir) / PATIENT_STORE_FILE).exists():
+        metrics_path = Path(store_dir) / PATIENT_METRICS_FILE
+        # Missing, or written before registrations were counted apart from the store rows
+        if not metrics_path.exists() or 'registrations' not in json.loads(metrics_path.read_text()):
+            seed_patient_metrics(store_dir)
+        return meta
+    return build_patient_store(generate_thyroid_data(n_samples=n_samples), store_dir)
+
+# Materialized dashboard counters, folded in on every ingest so the Main Terminal never scans the store
+PATIENT_METRICS_FILE = "metrics.json"
+PATIENT_STORE_CAPACITY = int(os.environ.get("THYROID_STORE_CAPACITY", "5000000"))
+ALERT_BUFFER_SIZE = 100
+ALERTS_PER_BATCH = 5
+TSH_CRITICAL_RANGE = (0.1, 10.0)
+ALERTS_SHOWN = 7
+ALERT_MESSAGE_WIDTH = 41
+ALERT_COLORS = {'HIGH': '#ff4444', 'MEDIUM': '#ff6b35', 'INFO': '#00ff41'}
+
+class PatientMetrics:
+    """Running totals, monthly intake and a bounded alert buffer, persisted next to the patient store"""
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.state = {**self.empty(), **json.loads(self.path.read_text())} if self.path.exists() else self.empty()
+    
+    @staticmethod
+    def empty():
+        return {'total': 0, 'registrations': 0, 'abnormal': 0, 'high_risk': 0, 'by_diagnosis': {}, 'by_month': {}, 'alerts': []}
+    
+    def ingest(self, df, source="Lab batch"):
+        """Fold a batch of scored patient records into the counters; O(batch), independent of store size"""
+        if len(df) == 0:
+            return
+        now = datetime.now()
+        tsh = pd.to_numeric(df['TSH'], errors='coerce') if 'TSH' in df else pd.Series(np.nan, index=df.index)
+        critical = df[(tsh < TSH_CRITICAL_RANGE[0]) | (tsh > TSH_CRITICAL_RANGE[1])]
+        
+        alerts = [self._alert(now, 'INFO', f"{source} ingested - {len(df):,} patient{'s' if len(df) != 1 else ''}")]
+        alerts += [self._alert(now, 'HIGH', f"TSH LEVEL CRITICAL - Patient {pid}")
+                   for pid in format_patient_ids(critical['PatientID'].tail(ALERTS_PER_BATCH))]
+        
+        with self.lock:
+            self._count(df, {now.strftime('%Y-%m'): len(df)})
+            self.state['alerts'] = (self.state['alerts'] + alerts)[-ALERT_BUFFER_SIZE:]
+            self._save()
     
-    return pd.DataFrame(data)
+    def backfill(self, batches, source="Backfill"):
+        """Recount from scratch over historical batches, saving once and raising a single alert
+        
+        Only rows with a SubmittedAt date count towards the monthly intake; the cohort rows have none.
+        """
+        total = 0
+        with self.lock:
+            self.state = self.empty()
+            for df in batches:
+                self._count(df, submitted_months(df))
+                total += len(df)
+            self.state['alerts'] = [
+                self._alert(datetime.now(), 'INFO', f"{source} ingested - {total:,} patient{'s' if total != 1 else ''}")
+            ]
+            self._save()
+    
+    def _count(self, df, by_month):
+        """Add a batch to the counters; the caller holds the lock"""
+        diagnoses = df['Diagnosis'].value_counts()
+        diagnoses = diagnoses[diagnoses > 0]
+        state = self.state
+        state['total'] += int(len(df))
+        # Registrations live in the record log, not the Parquet store; they are the rows with a SubmittedAt
+        if 'SubmittedAt' in df.columns:
+            state['registrations'] += int(df['SubmittedAt'].notna().sum())
+        state['abnormal'] += int(diagnoses.drop('Normal', errors='ignore').sum())
+        state['high_risk'] += int((df['Risk_Level'] == 'High').sum())
+        for diagnosis, count in diagnoses.items():
+            state['by_diagnosis'][diagnosis] = state['by_diagnosis'].get(diagnosis, 0) + int(count)
+        for month, count in by_month.items():
+            state['by_month'][month] = state['by_month'].get(month, 0) + int(count)
+    
+    @staticmethod
+    def _alert(at, priority, message):
+        return {'time': at.strftime('%H:%M:%S'), 'priority': priority, 'message': message}
+    
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.state))
+    
+    def _save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.state))
+        os.replace(tmp_path, self.path)
+
+def seed_patient_metrics(store_dir=PATIENT_STORE_DIR):
+    """One-off backfill for stores written before the counters existed, streamed batch by batch"""
+    import pyarrow.parquet as pq
+    
+    metrics = PatientMetrics(Path(store_dir) / PATIENT_METRICS_FILE)
+    columns = ['Diagnosis', 'Risk_Level']
+    batches = (batch.to_pandas() for batch in
+               pq.ParquetFile(Path(store_dir) / PATIENT_STORE_FILE).iter_batches(columns=columns))
+    metrics.backfill(itertools.chain(batches, registration_batches()), source="Backfill")
+    return metrics
+
+def registration_batches():
+    """Every registration in the record log as one frame (none if the log is empty), for recounts"""
+    records = get_record_log().records()
+    return [pd.DataFrame(records)] if records else []
+
+def submitted_months(df):
+    """Row counts per 'YYYY-MM' of SubmittedAt; rows without a submission date are not counted"""
+    if 'SubmittedAt' not in df.columns:
+        return {}
+    months = pd.to_datetime(df['SubmittedAt'], errors='coerce').dt.strftime('%Y-%m')
+    return months.value_counts().to_dict()
+
+@st.cache_resource
+def get_patient_metrics(store_dir=PATIENT_STORE_DIR, version=None):
+    """One counter set per store version, shared by every session"""
+    return PatientMetrics(Path(store_dir) / PATIENT_METRICS_FILE)
+
+def persist_registrations(df, source="Patient Entry"):
+    """Durably append scored registrations to the record log, then fold them into the dashboard counters"""
+    df = df.assign(
+        Diagnosis=pd.Series(diagnose_tsh(df['TSH']), index=df.index).where(df['TSH'].notna()),
+        SubmittedAt=datetime.now().isoformat(timespec='seconds'),
+    )
+    # The summary is loaded first, so a first-time build does not see (and double count) this batch
+    meta = ensure_patient_store()
+    summary = load_hormone_summary(str(PATIENT_STORE_DIR), meta['version'])
+    
+    # Blocks until the group commit holding these records has been fsynced
+    get_record_log().submit(json.loads(df.to_json(orient='records', date_format='iso')))
+    get_patient_metrics(PATIENT_STORE_DIR, meta['version']).ingest(df, source=source)
+    summary.update(df)
+    return df
+
+# Bulk registration: the Patient Entry rules applied column-wise to a whole intake file
+REGISTRATION_CONSENTS = {
+    'Consent_Treatment': "Treatment consent is required",
+    'Consent_Data': "Data storage consent is required",
+    'Consent_Contact': "Contact consent is required",
+}
+REGISTRATION_LAB_COLUMNS = ['TSH', 'T3', 'T4']
+REGISTRATION_TEMPLATE_COLUMNS = (
+    ['PatientID', 'First_Name', 'Last_Name', 'Birth_Date', 'Gender']
+    + list(SCREENING_HISTORY_WEIGHTS) + SCREENING_SYMPTOM_COLUMNS
+    + REGISTRATION_LAB_COLUMNS + list(REGISTRATION_CONSENTS)
+)
+
+def read_registrations(uploaded_file):
+    """Parse an intake CSV as text, indexed by file line, with lab values coerced to numbers (unparseable ones become missing)
+    
+    Line numbers assume one record per line (no line breaks inside quoted fields).
+    """
+    uploaded_file.seek(0)
+    df = pd.read_csv(uploaded_file, dtype=str, skip_blank_lines=False)
+    # Blank lines come through as empty rows, so row positions still line up with the file
+    df.index = pd.RangeIndex(2, len(df) + 2, name='Line')  # 1-based, after the header line
+    df = df[df.notna().any(axis=1)]
+    for col in REGISTRATION_LAB_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce') if col in df.columns else np.nan
+    return df
+
+def validate_registrations(df):
+    """Boolean failure matrix: one row per registration, one column per Patient Entry rule"""
+    def missing(col):
+        if col not in df.columns:
+            return np.ones(len(df), dtype=bool)
+        return df[col].fillna('').astype(str).str.strip().eq('').to_numpy()
+    
+    no_id = missing('PatientID')
+    patient_ids = df['PatientID'].fillna('') if 'PatientID' in df.columns else pd.Series('', index=df.index)
+    checks = {
+        "First name is required": missing('First_Name'),
+        "Last name is required": missing('Last_Name'),
+        "Patient ID is required": no_id,
+        "Patient ID must start with 'THY-'": ~no_id & ~patient_ids.astype(str).str.startswith('THY-').to_numpy(),
+    }
+    for col, message in REGISTRATION_CONSENTS.items():
+        checks[message] = ~_yes(df, col)
+    return pd.DataFrame(checks, index=df.index)
+
+def check_registrations(df):
+    """Validate and score a registration frame in one pass; returns (scored valid rows, per-row error report)
+    
+    The report's Line is the frame's index, which read_registrations sets to the file line.
+    """
+    failures = validate_registrations(df)
+    rows, rules = np.nonzero(failures.to_numpy())
+    patient_ids = df['PatientID'] if 'PatientID' in df.columns else pd.Series(np.nan, index=df.index)
+    report = pd.DataFrame({
+        'Line': df.index.to_numpy()[rows],
+        'PatientID': patient_ids.to_numpy()[rows],
+        'Error': failures.columns.to_numpy()[rules],
+    })
+    valid = df[~failures.any(axis=1).to_numpy()]
+    return valid.join(score_screening(valid)), report
+
+@st.cache_resource
+def open_patient_store(store_dir, version):
+    """Open the Parquet store as a memory-mapped Arrow dataset (one handle per store version)"""
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    
+    return ds.dataset(
+        str(Path(store_dir) / PATIENT_STORE_FILE),
+        format="parquet",
+        filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
+
+def patient_filter_expression(age_range, genders, diagnoses, risk_levels):
+    """Translate the sidebar filters into an Arrow predicate that is pushed down to the scan"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    
+    # Typed value sets, so a cleared multiselect matches nothing instead of failing as a null-typed set
+    def one_of(col, values):
+        return ds.field(col).isin(pa.array(list(values), type=pa.string()))
+    
+    return (
+        (ds.field('Age') >= age_range[0]) &
+        (ds.field('Age') <= age_range[1]) &
+        one_of('Gender', genders) &
+        one_of('Diagnosis', diagnoses) &
+        one_of('Risk_Level', risk_levels)
+    )
+
+# Indexed filtering over the patient store
+FILTER_CATEGORY_COLUMNS = ['Gender', 'Diagnosis', 'Risk_Level']
+
+class PatientIndex:
+    """Sorted Age index, packed per-category bitmaps and lazy per-column sort permutations, built once per store version
+    
+    Only the filter columns are read up front; a column needed for sorting or a statistic is read from the
+    dataset the first time it is asked for.
+    """
+    
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.columns = dataset.schema.names
+        table = dataset.to_table(columns=['Age'] + FILTER_CATEGORY_COLUMNS)
+        self.table = table
+        self.n_rows = table.num_rows
+        
+        # Sorted Age index: a range lookup is two binary searches
+        age = table.column('Age').to_numpy()
+        self.age_order = np.argsort(age, kind='stable')
+        self.age_sorted = age[self.age_order]
+        
+        # One packed bitmap per category value
+        self.bitmaps = {}
+        for col in FILTER_CATEGORY_COLUMNS:
+            codes, uniques = pd.factorize(table.column(col).to_numpy(zero_copy_only=False))
+            self.bitmaps[col] = {value: np.packbits(codes == i) for i, value in enumerate(uniques)}
+        self._empty = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        
+        # Per-filter results are memoized so changing one filter reuses the others
+        self.age_bitmap = lru_cache(maxsize=64)(self._age_bitmap)
+        self.category_bitmap = lru_cache(maxsize=64)(self._category_bitmap)
+        self.values = lru_cache(maxsize=None)(self._values)
+        self.sort_order = lru_cache(maxsize=None)(self._sort_order)
+    
+    def _age_bitmap(self, lo, hi):
+        start = np.searchsorted(self.age_sorted, lo, side='left')
+        stop = np.searchsorted(self.age_sorted, hi, side='right')
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.age_order[start:stop]] = True
+        return np.packbits(mask)
+    
+    def _category_bitmap(self, col, values):
+        bitmap = self._empty
+        for value in values:
+            if value in self.bitmaps[col]:
+                bitmap = bitmap | self.bitmaps[col][value]
+        return bitmap
+    
+    def _values(self, col):
+        if col in self.table.column_names:
+            return self.table.column(col).to_pandas()
+        return self.dataset.to_table(columns=[col]).column(col).to_pandas()
+    
+    def _sort_order(self, col):
+        # Categoricals sort in category order (Low < Medium < High), not alphabetically
+        values = self.values(col)
+        keys = values.cat.codes if isinstance(values.dtype, pd.CategoricalDtype) else values
+        return np.argsort(keys.to_numpy(), kind='stable')
+    
+    def bitmap(self, age_range, genders, diagnoses, risk_levels):
+        """Packed bitmap of the rows matching all filters"""
+        bitmap = self.age_bitmap(int(age_range[0]), int(age_range[1]))
+        for col, values in zip(FILTER_CATEGORY_COLUMNS, [genders, diagnoses, risk_levels]):
+            bitmap = bitmap & self.category_bitmap(col, tuple(sorted(values)))
+        return bitmap
+    
+    def count(self, bitmap, col=None, values=()):
+        """Rows set in a bitmap, optionally also restricted to some values of a category column"""
+        if col is not None:
+            bitmap = bitmap & self.category_bitmap(col, tuple(sorted(values)))
+        return int(np.bitwise_count(bitmap).sum())
+    
+    def page(self, bitmap, sort_by, ascending, start, size):
+        """Row positions of one page of the filtered rows in sort_by order"""
+        order = self.sort_order(sort_by)
+        if not ascending:
+            order = order[::-1]
+        mask = np.unpackbits(bitmap, count=self.n_rows).view(bool)
+        return order[mask[order]][start:start + size]
+
+@st.cache_resource(show_spinner="Indexing patient store...")
+def load_patient_index(store_dir, version):
+    """Build the filter index for one store version"""
+    return PatientIndex(open_patient_store(store_dir, version))
+
+PATIENT_PAGE_SIZES = [25, 50, 100, 250]
+
+def page_patient_store(meta, bitmap, sort_by, ascending, page, page_size, store_dir=PATIENT_STORE_DIR):
+    """Sort and slice the filtered rows on the server; only the requested page is read in full"""
+    index = load_patient_index(str(store_dir), meta['version'])
+    positions = index.page(bitmap, sort_by, ascending, page * page_size, page_size)
+    return index.dataset.take(positions).to_pandas()
+
+@st.cache_resource(show_spinner="Loading patient store...")
+def load_patient_columns(store_dir, version, columns):
+    """Read-only pandas view of a few store columns, shared by the chart pages"""
+    return open_patient_store(store_dir, version).to_table(columns=list(columns)).to_pandas()
+
+# Server-side reduction of large scatter plots
+SCATTER_POINT_LIMIT = 20000
+
+def downsample_points(table, columns, max_points=SCATTER_POINT_LIMIT, bins=32, seed=0):
+    """Density-preserving sample of an Arrow table: bin the points on a grid, keep each cell's share of max_points (at least one)"""
+    n = table.num_rows
+    if n <= max_points:
+        return table
+    
+    # Flattened 2D/3D grid cell of every point
+    cell = np.zeros(n, dtype=np.int64)
+    for col in columns:
+        values = table.column(col).to_numpy().astype('float64')
+        lo, hi = np.nanmin(values), np.nanmax(values)
+        scaled = (values - lo) / (hi - lo) if hi > lo else np.zeros(n)
+        cell = cell * bins + np.clip((scaled * bins).astype(np.int64), 0, bins - 1)
+    
+    # Random rank of each point within its cell, then a per-cell quota
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(n), cell))
+    sorted_cells = cell[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    counts = np.diff(np.r_[starts, n])
+    quota = np.maximum(1, counts * max_points // n)
+    rank = np.arange(n) - np.repeat(starts, counts)
+    keep = order[rank < np.repeat(quota, counts)]
+    return table.take(np.sort(keep))
+
+@st.cache_resource(show_spinner=False)
+def sample_patient_points(store_dir, version, columns):
+    """Downsampled store rows for a scatter over the given columns (plus Age and Diagnosis), computed once per store version"""
+    selected = list(dict.fromkeys([*columns, 'Age', 'Diagnosis']))
+    table = open_patient_store(store_dir, version).to_table(columns=selected)
+    return downsample_points(table, list(columns)).to_pandas()
+
+# Incremental chart summaries
+CORRELATION_COLUMNS = ['TSH', 'T3', 'T4', 'T4U', 'FTI', 'Age']
+TSH_HISTOGRAM_RANGE = (0.0, 50.0)
+TSH_HISTOGRAM_BASE_BINS = 5000
+
+class HormoneSummary:
+    """Fine TSH histogram and running Pearson sums, updated as record batches arrive"""
+    
+    def __init__(self, hist_range=TSH_HISTOGRAM_RANGE, base_bins=TSH_HISTOGRAM_BASE_BINS):
+        self.lock = threading.Lock()
+        self.edges = np.linspace(hist_range[0], hist_range[1], base_bins + 1)
+        self.counts = np.zeros(base_bins, dtype=np.int64)
+        k = len(CORRELATION_COLUMNS)
+        self.n = 0
+        self.shift = None
+        self.sums = np.zeros(k)
+        self.cross = np.zeros((k, k))
+    
+    def update(self, df):
+        """Fold in a batch; rows missing a correlation column only count towards the histogram"""
+        with self.lock:
+            if 'TSH' in df.columns:
+                tsh = pd.to_numeric(df['TSH'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+                tsh = np.clip(tsh[~np.isnan(tsh)], self.edges[0], self.edges[-1])
+                self.counts += np.histogram(tsh, bins=self.edges)[0]
+            
+            if not set(CORRELATION_COLUMNS).issubset(df.columns):
+                return
+            x = df[CORRELATION_COLUMNS].apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            x = x[~np.isnan(x).any(axis=1)]
+            if len(x) == 0:
+                return
+            if self.shift is None:
+                # Sums are kept around a fixed shift to avoid catastrophic cancellation
+                self.shift = x.mean(axis=0)
+            x = x - self.shift
+            self.n += len(x)
+            self.sums += x.sum(axis=0)
+            self.cross += x.T @ x
+    
+    def histogram(self, bins):
+        """Re-bin the base counts into about `bins` equal-width bins over the occupied range"""
+        with self.lock:
+            base = self.counts.copy()
+        occupied = np.flatnonzero(base)
+        if len(occupied) == 0:
+            return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+        first, last = occupied[0], occupied[-1] + 1
+        group = (np.arange(last - first) * bins) // (last - first)
+        counts = np.bincount(group, weights=base[first:last], minlength=bins).astype(np.int64)
+        bounds = np.r_[first + np.searchsorted(group, np.arange(bins)), last]
+        left, right = self.edges[bounds[:-1]], self.edges[bounds[1:]]
+        
+        # A span narrower than `bins` base bins leaves some groups without any base bin
+        present = np.bincount(group, minlength=bins) > 0
+        return ((left + right) / 2)[present], (right - left)[present], counts[present]
+    
+    def correlation(self):
+        """Pearson correlation matrix from the running sums"""
+        with self.lock:
+            n, sums, cross = self.n, self.sums.copy(), self.cross.copy()
+        mean = sums / n
+        cov = cross / n - np.outer(mean, mean)
+        std = np.sqrt(np.diag(cov))
+        return pd.DataFrame(cov / np.outer(std, std), index=CORRELATION_COLUMNS, columns=CORRELATION_COLUMNS)
+
+@st.cache_resource(show_spinner="Summarizing patient store...")
+def load_hormone_summary(store_dir, version):
+    """Chart summaries for one store version: its record batches plus registrations, then updated on each append
+    
+    Uploaded files are profiled on their own (UploadProfile) and never become part of the store, so they do not
+    feed these summaries.
+    """
+    summary = HormoneSummary()
+    dataset = open_patient_store(store_dir, version)
+    for batch in dataset.to_batches(columns=CORRELATION_COLUMNS, batch_size=EXPORT_BATCH_ROWS):
+        summary.update(batch.to_pandas())
+    records = get_record_log().records()
+    if records:
+        summary.update(pd.DataFrame(records))
+    return summary
+
+@st.cache_resource(show_spinner="Ranking patient store...")
+def load_spearman_correlation(store_dir, version):
+    """Rank correlation has no mergeable running form, so it is computed once per store version"""
+    return open_patient_store(store_dir, version).to_table(columns=CORRELATION_COLUMNS).to_pandas().corr(method='spearman')
+
+# On-demand export of patient data
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+EXPORT_BATCH_ROWS = 65536
+
+def write_export(batches, schema, fmt):
+    """Encode Arrow record batches, one at a time, as CSV, gzipped CSV or Parquet bytes"""
+    import pyarrow.parquet as pq
+    
+    # download_button buffers the whole payload in memory anyway, so build it in a BytesIO
+    out = io.BytesIO()
+    if fmt == "Parquet":
+        with pq.ParquetWriter(out, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    else:
+        sink = gzip.GzipFile(fileobj=out, mode='wb') if fmt == "CSV (gzip)" else out
+        header = True
+        for batch in batches:
+            sink.write(render_patient_ids(batch.to_pandas()).to_csv(index=False, header=header).encode('utf-8'))
+            header = False
+        if header:
+            sink.write(pd.DataFrame(columns=schema.names).to_csv(index=False).encode('utf-8'))
+        if sink is not out:
+            sink.close()
+    return out.getvalue()
+
+def export_button(label, make_batches, schema, file_stem, key):
+    """Download button whose file is only generated, batch by batch, when clicked"""
+    fmt = st.selectbox("Export Format", list(EXPORT_FORMATS), key=f"{key}_format")
+    extension, mime = EXPORT_FORMATS[fmt]
+    st.download_button(
+        label=label,
+        data=lambda: write_export(make_batches(), schema, fmt),
+        file_name=f"{file_stem}.{extension}",
+        mime=mime,
+        key=key
+    )
+
+# Chunked CSV ingestion with running statistics
+INGEST_CHUNK_ROWS = 50000
+QUANTILE_SKETCH_SIZE = 8192
+
+class RunningStats:
+    """Streaming count/mean/variance/min/max plus a bounded uniform sample for quantiles"""
+    
+    def __init__(self, rng, sketch_size=QUANTILE_SKETCH_SIZE):
+        self.rng = rng
+        self.sketch_size = sketch_size
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sample = np.empty(0)
+        self.sample_keys = np.empty(0)
+    
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if n == 0:
+            return
+        
+        # Chan et al. parallel merge of (count, mean, M2)
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        
+        # Bottom-k sampling: keep the values with the smallest random keys
+        keys = np.concatenate([self.sample_keys, self.rng.random(n)])
+        sample = np.concatenate([self.sample, values])
+        if len(keys) > self.sketch_size:
+            keep = np.argpartition(keys, self.sketch_size)[:self.sketch_size]
+            keys, sample = keys[keep], sample[keep]
+        self.sample_keys, self.sample = keys, sample
+    
+    def summary(self):
+        """Return the same fields as DataFrame.describe() for a numeric column"""
+        if self.count == 0:
+            return [0, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan]
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        q25, q50, q75 = np.quantile(self.sample, [0.25, 0.5, 0.75])
+        return [self.count, self.mean, std, self.min, q25, q50, q75, self.max]
+
+VIOLATION_CODES = {1: 'invalid', 2: 'low', 3: 'high'}
+VIOLATION_PREVIEW_ROWS = 200
+
+class LabValidator:
+    """LAB_SCHEMA compiled into whole-chunk NumPy masks; keeps a packed 2-bit status per cell only for failing rows"""
+    
+    def __init__(self, columns, schema=LAB_SCHEMA):
+        self.columns = [col for col in schema if col in columns]
+        if len(self.columns) > 32:
+            raise ValueError("A packed status holds at most 32 columns")
+        self.numeric = [col for col in self.columns if schema[col]['type'] in ('int', 'float')]
+        self.numeric_pos = np.array([self.columns.index(col) for col in self.numeric], dtype=np.intp)
+        self.bounds = np.array([schema[col]['bounds'] for col in self.numeric], dtype='float64').reshape(-1, 2).T
+        self.reference = np.array(
+            [schema[col].get('reference', (-np.inf, np.inf)) for col in self.numeric], dtype='float64'
+        ).reshape(-1, 2).T
+        self.integer = np.array([schema[col]['type'] == 'int' for col in self.numeric], dtype=bool)
+        self.patterns = {col: schema[col]['pattern'] for col in self.columns if schema[col]['type'] == 'id'}
+        self.allowed = {
+            col: [value.lower() for value in schema[col]['values']] if schema[col]['type'] == 'category' else LAB_FLAG_VALUES
+            for col in self.columns if schema[col]['type'] in ('category', 'flag')
+        }
+        self.shifts = (2 * np.arange(len(self.columns))).astype(np.uint64)
+        self.counts = np.zeros((len(self.columns), 5), dtype=np.int64)
+        self.row_chunks = []
+        self.code_chunks = []
+    
+    def update(self, chunk, offset):
+        """Check one chunk; offset is the file row number of its first row"""
+        status = np.zeros((len(chunk), len(self.columns)), dtype=np.uint8)
+        missing = np.zeros_like(status, dtype=bool)
+        
+        if self.numeric:
+            raw = chunk[self.numeric]
+            blank = raw.isna().to_numpy()
+            values = raw.apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            with np.errstate(invalid='ignore'):
+                invalid = ((np.isnan(values) & ~blank)
+                           | (values < self.bounds[0]) | (values > self.bounds[1])
+                           | (self.integer & (values != np.floor(values)) & ~np.isnan(values)))
+                block = np.select(
+                    [invalid, values < self.reference[0], values > self.reference[1]], [1, 2, 3], default=0
+                ).astype(np.uint8)
+            status[:, self.numeric_pos] = block
+            missing[:, self.numeric_pos] = blank
+        
+        for col, pattern in self.patterns.items():
+            pos = self.columns.index(col)
+            values = chunk[col]
+            missing[:, pos] = values.isna().to_numpy()
+            status[:, pos] = ~missing[:, pos] & ~values.astype(str).str.fullmatch(pattern).to_numpy(dtype=bool)
+        
+        # Categorical columns hold few distinct values: check those once, then map back by code
+        for col, allowed in self.allowed.items():
+            pos = self.columns.index(col)
+            codes, uniques = pd.factorize(chunk[col])
+            ok = pd.Index(uniques).astype(str).str.strip().str.lower().isin(allowed)
+            missing[:, pos] = codes < 0
+            status[:, pos] = (codes >= 0) & ~np.append(ok, True)[codes]
+        
+        # Per-column tallies: present, missing, then one column per violation code
+        self.counts[:, 0] += (~missing).sum(axis=0)
+        self.counts[:, 1] += missing.sum(axis=0)
+        for code in VIOLATION_CODES:
+            self.counts[:, 1 + code] += (status == code).sum(axis=0)
+        
+        packed = (status.astype(np.uint64) << self.shifts).sum(axis=1, dtype=np.uint64)
+        rows = np.flatnonzero(packed)
+        self.row_chunks.append((rows + offset).astype(np.int64))
+        self.code_chunks.append(packed[rows])
+    
+    def summary(self):
+        """Per-column counts of present, missing, invalid and out-of-range values"""
+        counts = pd.DataFrame(self.counts, index=self.columns, columns=['Present', 'Missing', 'Invalid', 'Low', 'High'])
+        counts['Abnormal %'] = ((counts['Low'] + counts['High']) / counts['Present'].clip(lower=1) * 100).round(2)
+        return counts
+    
+    def abnormal(self, col):
+        if col not in self.columns:
+            return 0
+        return int(self.counts[self.columns.index(col), 3:].sum())
+    
+    def violation_index(self):
+        """(row numbers, packed status) for every row with at least one violation"""
+        if not self.row_chunks:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+        if len(self.row_chunks) > 1:
+            self.row_chunks = [np.concatenate(self.row_chunks)]
+            self.code_chunks = [np.concatenate(self.code_chunks)]
+        return self.row_chunks[0], self.code_chunks[0]
+    
+    def violations(self, limit=VIOLATION_PREVIEW_ROWS):
+        """Decode the first rows of the violation index into a readable table"""
+        rows, codes = self.violation_index()
+        rows, codes = rows[:limit], codes[:limit]
+        status = (codes[:, None] >> self.shifts) & np.uint64(3)
+        issues = pd.DataFrame(np.vectorize(VIOLATION_CODES.get, otypes=[object])(status), columns=self.columns)
+        issues.insert(0, 'Line', rows + 2)  # 1-based, after the header line
+        return issues.fillna('')
+    
+    def nbytes(self):
+        return sum(rows.nbytes for rows in self.row_chunks) + sum(codes.nbytes for codes in self.code_chunks)
+
+class UploadProfile:
+    """Incremental profile of an uploaded CSV, built chunk by chunk"""
+    
+    def __init__(self, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.memory_bytes = 0
+        self.compact_bytes = 0
+        self.dtypes = None
+        self.preview = None
+        self.missing = None
+        self.stats = {}
+        self.validator = None
+        self.risk_counts = None
+    
+    def update(self, chunk):
+        # Validation sees the raw text; everything else works on the compact frame
+        self.validator = self.validator or LabValidator(chunk.columns)
+        self.validator.update(chunk, self.rows)
+        raw_bytes = int(chunk.memory_usage(deep=True).sum())
+        chunk = compact_patient_frame(chunk)
+        
+        if self.dtypes is None:
+            # Column types are inferred from the first chunk
+            self.dtypes = chunk.dtypes
+            self.preview = chunk.head(10)
+            self.missing = pd.Series(0, index=chunk.columns, dtype='int64')
+            numeric = chunk.select_dtypes(include='number').columns.drop('PatientID', errors='ignore')
+            self.stats = {col: RunningStats(self.rng) for col in numeric}
+        
+        self.rows += len(chunk)
+        self.memory_bytes += raw_bytes
+        self.compact_bytes += int(chunk.memory_usage(deep=True).sum())
+        self.missing = self.missing.add(chunk.isnull().sum(), fill_value=0).astype('int64')
+        for col, stats in self.stats.items():
+            values = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            stats.update(values)
+        
+        # Score every row with the shared engine and keep only the counts
+        if 'TSH' in self.stats:
+            scores = score_lab_results(chunk)
+            counts = pd.crosstab(scores['Diagnosis'], scores['Risk_Level'])
+            self.risk_counts = counts if self.risk_counts is None else self.risk_counts.add(counts, fill_value=0).astype('int64')
+    
+    def nbytes(self):
+        """Approximate memory held by the profile"""
+        sketches = sum(stats.sample.nbytes + stats.sample_keys.nbytes for stats in self.stats.values())
+        return int(self.preview.memory_usage(deep=True).sum()) + sketches + self.validator.nbytes() + 1024
+    
+    def describe(self, columns):
+        """Summary table for the given numeric columns, shaped like DataFrame.describe()"""
+        index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        return pd.DataFrame({col: self.stats[col].summary() for col in columns if col in self.stats}, index=index)
+
+def profile_csv(uploaded_file, chunk_rows=INGEST_CHUNK_ROWS, progress=None):
+    """Read a CSV upload in bounded chunks, folding each chunk into an UploadProfile"""
+    profile = UploadProfile()
+    size = max(getattr(uploaded_file, 'size', 0), 1)
+    for chunk in pd.read_csv(uploaded_file, chunksize=chunk_rows):
+        profile.update(chunk)
+        if progress is not None:
+            progress.progress(min(uploaded_file.tell() / size, 1.0), text=f"Parsed {profile.rows:,} rows...")
+    if profile.dtypes is None:
+        raise ValueError("No rows found in uploaded file")
+    return profile
+
+# Content-addressed cache of parsed uploads
+UPLOAD_CACHE_BYTES = 256 * 1024 * 1024
+
+class UploadCache:
+    """LRU cache of upload profiles keyed by content hash, bounded by a total memory budget"""
+    
+    def __init__(self, budget_bytes=UPLOAD_CACHE_BYTES):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+    
+    def put(self, key, value, nbytes):
+        with self.lock:
+            if key in self.entries:
+                self.used_bytes -= self.entries.pop(key)[1]
+            if nbytes > self.budget_bytes:
+                return
+            self.entries[key] = (value, nbytes)
+            self.used_bytes += nbytes
+            while self.used_bytes > self.budget_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.used_bytes -= evicted
+
+@st.cache_resource
+def get_upload_cache():
+    """Process-wide upload cache shared by all sessions"""
+    return UploadCache()
+
+def upload_digest(uploaded_file, block_size=1024 * 1024):
+    """Hash an upload's content in fixed-size blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    uploaded_file.seek(0)
+    for block in iter(lambda: uploaded_file.read(block_size), b''):
+        digest.update(block)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+def load_upload_profile(uploaded_file):
+    """Return the profile for an upload, parsing it only if this content has not been seen"""
+    cache = get_upload_cache()
+    key = upload_digest(uploaded_file)
+    profile = cache.get(key)
+    if profile is None:
+        progress = st.progress(0.0, text="Parsing upload...")
+        profile = profile_csv(uploaded_file, progress=progress)
+        progress.empty()
+        cache.put(key, profile, profile.nbytes())
+    return profile
+
+# RandomForest diagnostic model
+MODEL_PATH = Path(os.environ.get("THYROID_MODEL_PATH", "models/thyroid_rf.joblib"))
+MODEL_TRAIN_ROWS = 20000
+MODEL_NUMERIC_FEATURES = ['Age', 'TSH', 'T3', 'T4', 'T4U', 'FTI']
+MODEL_FLAG_FEATURES = ['Goitre', 'Tumor', 'Hypopituitary', 'Psych']
+MODEL_FEATURES = MODEL_NUMERIC_FEATURES + ['Female'] + MODEL_FLAG_FEATURES
+
+def model_features(df, fill_values=None):
+    """Float32 feature matrix for the diagnostic model; missing values take the training medians"""
+    features = pd.DataFrame(index=df.index)
+    for col in MODEL_NUMERIC_FEATURES:
+        features[col] = pd.to_numeric(df[col], errors='coerce') if col in df.columns else np.nan
+    features['Female'] = (df['Gender'] == 'Female').to_numpy() if 'Gender' in df.columns else False
+    for col in MODEL_FLAG_FEATURES:
+        features[col] = _yes(df, col)
+    if fill_values is not None:
+        features = features.fillna(fill_values)
+    return features[MODEL_FEATURES].to_numpy(dtype=np.float32)
+
+def train_diagnostic_model(df, path=MODEL_PATH, seed=42):
+    """Train, evaluate and persist the RandomForest diagnosis model"""
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, classification_report
+    from sklearn.model_selection import train_test_split
+    
+    fill_values = df[MODEL_NUMERIC_FEATURES].median()
+    X = model_features(df, fill_values)
+    y = df['Diagnosis'].to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed, stratify=y)
+    
+    model = RandomForestClassifier(n_estimators=100, max_depth=12, random_state=seed, n_jobs=-1)
+    model.fit(X_train, y_train)
+    
+    # Batch inference latency is measured on the held-out set
+    start = time.perf_counter()
+    y_proba = model.predict_proba(X_test)
+    latency = (time.perf_counter() - start) / len(X_test)
+    y_pred = model.classes_[y_proba.argmax(axis=1)]
+    
+    bundle = {
+        'model': model,
+        'fill_values': fill_values.to_dict(),
+        'metrics': {
+            'accuracy': float(accuracy_score(y_test, y_pred)),
+            'report': classification_report(y_test, y_pred, output_dict=True, zero_division=0),
+            'train_rows': int(len(X_train)),
+            'test_rows': int(len(X_test)),
+            'latency_us_per_row': latency * 1e6,
+            'trained_at': datetime.now().isoformat(timespec='seconds'),
+        },
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(bundle, path)
+    path.with_suffix('.json').write_text(json.dumps(bundle['metrics']))
+    return bundle
+
+@st.cache_resource(show_spinner="Loading (or, on first use, training) the diagnostic model...")
+def load_diagnostic_model(path=MODEL_PATH):
+    """Load the persisted model once per process, training it on first use"""
+    import joblib
+    
+    if Path(path).exists():
+        return joblib.load(path)
+    return train_diagnostic_model(generate_thyroid_data(n_samples=MODEL_TRAIN_ROWS), path)
+
+def load_model_metrics(path=MODEL_PATH):
+    """Model metrics from the JSON sidecar, or None before the model has been trained
+    
+    Never trains: the landing page reads this, and training belongs to Data Import or train_model.py.
+    """
+    metrics_path = Path(path).with_suffix('.json')
+    if not metrics_path.exists():
+        return None
+    return json.loads(metrics_path.read_text())
+
+def predict_diagnosis(bundle, df):
+    """Batch predict_proba over a frame; returns the class probabilities and the per-row latency in seconds"""
+    X = model_features(df, bundle['fill_values'])
+    start = time.perf_counter()
+    proba = bundle['model'].predict_proba(X)
+    latency = (time.perf_counter() - start) / max(len(X), 1)
+    return pd.DataFrame(proba, columns=bundle['model'].classes_, index=df.index), latency
+
+def predict_csv(uploaded_file, bundle, chunk_rows=INGEST_CHUNK_ROWS):
+    """Run the model over an upload chunk by chunk, keeping predicted-class counts, a preview and the mean latency"""
+    uploaded_file.seek(0)
+    counts = pd.Series(0, index=bundle['model'].classes_, dtype='int64')
+    preview = None
+    rows, elapsed = 0, 0.0
+    for chunk in pd.read_csv(uploaded_file, chunksize=chunk_rows):
+        chunk = compact_patient_frame(chunk)
+        proba, latency = predict_diagnosis(bundle, chunk)
+        predicted = proba.idxmax(axis=1)
+        counts = counts.add(predicted.value_counts(), fill_value=0).astype('int64')
+        if preview is None:
+            preview = chunk.head(10).assign(Predicted=predicted.head(10), Confidence=proba.max(axis=1).head(10).round(3))
+        rows += len(chunk)
+        elapsed += latency * len(chunk)
+    uploaded_file.seek(0)
+    return {'counts': counts, 'preview': preview, 'rows': rows, 'latency_us_per_row': elapsed / max(rows, 1) * 1e6}
 
 def main():
     # Main title with retro computer styling
@@ -427,47 +1590,70 @@ def show_home():
     </div>
     ''', unsafe_allow_html=True)
     
+    # Counters are materialized on ingest; reading them is O(1) whatever the store size
+    meta = ensure_patient_store()
+    counters = get_patient_metrics(PATIENT_STORE_DIR, meta['version']).snapshot()
+    total = counters['total']
+    registrations = counters['registrations']
+    records = total - registrations  # what the Patient Database page reads
+    this_month = counters['by_month'].get(datetime.now().strftime('%Y-%m'), 0)
+    capacity = min(100.0, records / PATIENT_STORE_CAPACITY * 100)
+    high_risk_share = counters['high_risk'] / total * 100 if total else 0.0
+    
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown('''
+        st.markdown(f'''
         <div class="diagnostic-box">
             <div style="color: #00ff41; font-weight: bold; text-align: center; font-size: 1.1rem;">PATIENT DATABASE</div>
-            <div style="color: #ff6b35; font-size: 2.5rem; text-align: center; font-family: 'VT323', monospace;">1,247</div>
+            <div style="color: #ff6b35; font-size: 2.5rem; text-align: center; font-family: 'VT323', monospace;">{records:,}</div>
             <div style="color: #888; text-align: center;">TOTAL RECORDS</div>
-            <div style="color: #00ff41; text-align: center; font-size: 0.9rem;">↗ +23 THIS MONTH</div>
+            <div style="color: #00ff41; text-align: center; font-size: 0.9rem;">↗ +{registrations:,} NEW REGISTRATIONS ({this_month:,} THIS MONTH)</div>
             <div class="progress-bar-retro" style="margin-top: 10px;">
-                <div class="progress-fill" style="width: 89%;"></div>
+                <div class="progress-fill" style="width: {capacity:.0f}%;"></div>
             </div>
-            <div style="color: #888; text-align: center; font-size: 0.8rem; margin-top: 5px;">DATABASE: 89% CAPACITY</div>
+            <div style="color: #888; text-align: center; font-size: 0.8rem; margin-top: 5px;">DATABASE: {capacity:.1f}% CAPACITY</div>
         </div>
         ''', unsafe_allow_html=True)
     
     with col2:
-        st.markdown('''
-        <div class="diagnostic-box">
-            <div style="color: #00ff41; font-weight: bold; text-align: center; font-size: 1.1rem;">DIAGNOSTIC ACCURACY</div>
-            <div style="color: #ff6b35; font-size: 2.5rem; text-align: center; font-family: 'VT323', monospace;">94.8%</div>
-            <div style="color: #888; text-align: center;">AI MODEL PERFORMANCE</div>
-            <div style="color: #00ff41; text-align: center; font-size: 0.9rem;">↗ +1.2% IMPROVED</div>
-            <div class="progress-bar-retro" style="margin-top: 10px;">
-                <div class="progress-fill" style="width: 95%;"></div>
+        model_metrics = load_model_metrics()
+        if model_metrics is None:
+            st.markdown('''
+            <div class="diagnostic-box">
+                <div style="color: #00ff41; font-weight: bold; text-align: center; font-size: 1.1rem;">DIAGNOSTIC ACCURACY</div>
+                <div style="color: #ff6b35; font-size: 2.5rem; text-align: center; font-family: 'VT323', monospace;">--.-%</div>
+                <div style="color: #888; text-align: center;">AI MODEL NOT TRAINED</div>
+                <div style="color: #00ff41; text-align: center; font-size: 0.9rem;">RUN IT FROM 📁 DATA IMPORT</div>
+                <div style="color: #888; text-align: center; font-size: 0.8rem; margin-top: 5px;">OR: python train_model.py</div>
             </div>
-            <div style="color: #888; text-align: center; font-size: 0.8rem; margin-top: 5px;">CONFIDENCE: OPTIMAL</div>
-        </div>
-        ''', unsafe_allow_html=True)
+            ''', unsafe_allow_html=True)
+        else:
+            accuracy = model_metrics['accuracy'] * 100
+            st.markdown(f'''
+            <div class="diagnostic-box">
+                <div style="color: #00ff41; font-weight: bold; text-align: center; font-size: 1.1rem;">DIAGNOSTIC ACCURACY</div>
+                <div style="color: #ff6b35; font-size: 2.5rem; text-align: center; font-family: 'VT323', monospace;">{accuracy:.1f}%</div>
+                <div style="color: #888; text-align: center;">AI MODEL PERFORMANCE</div>
+                <div style="color: #00ff41; text-align: center; font-size: 0.9rem;">⏱ {model_metrics['latency_us_per_row']:.1f} µs/PATIENT</div>
+                <div class="progress-bar-retro" style="margin-top: 10px;">
+                    <div class="progress-fill" style="width: {accuracy:.0f}%;"></div>
+                </div>
+                <div style="color: #888; text-align: center; font-size: 0.8rem; margin-top: 5px;">HELD-OUT SET: {model_metrics['test_rows']:,} PATIENTS</div>
+            </div>
+            ''', unsafe_allow_html=True)
     
     with col3:
-        st.markdown('''
+        st.markdown(f'''
         <div class="diagnostic-box">
             <div style="color: #00ff41; font-weight: bold; text-align: center; font-size: 1.1rem;">PENDING ANALYSIS</div>
-            <div style="color: #ff6b35; font-size: 2.5rem; text-align: center; font-family: 'VT323', monospace;">42</div>
-            <div style="color: #888; text-align: center;">LAB RESULTS QUEUE</div>
-            <div style="color: #ff6b35; text-align: center; font-size: 0.9rem;">⚠ PRIORITY ATTENTION</div>
+            <div style="color: #ff6b35; font-size: 2.5rem; text-align: center; font-family: 'VT323', monospace;">{counters['high_risk']:,}</div>
+            <div style="color: #888; text-align: center;">HIGH RISK QUEUE</div>
+            <div style="color: #ff6b35; text-align: center; font-size: 0.9rem;">⚠ {counters['abnormal']:,} ABNORMAL RESULTS</div>
             <div class="progress-bar-retro" style="margin-top: 10px;">
-                <div class="progress-fill" style="width: 68%; background: linear-gradient(90deg, #ff6b35, #f7931e);"></div>
+                <div class="progress-fill" style="width: {high_risk_share:.0f}%; background: linear-gradient(90deg, #ff6b35, #f7931e);"></div>
             </div>
-            <div style="color: #888; text-align: center; font-size: 0.8rem; margin-top: 5px;">PROCESSING: 68%</div>
+            <div style="color: #888; text-align: center; font-size: 0.8rem; margin-top: 5px;">HIGH RISK: {high_risk_share:.1f}% OF RECORDS</div>
         </div>
         ''', unsafe_allow_html=True)
     
@@ -521,13 +1707,15 @@ def show_home():
         </div>
         ''', unsafe_allow_html=True)
         
-        st.markdown('''
+        accuracy = model_metrics['accuracy'] * 100 if model_metrics else 0.0
+        accuracy_status = f"{accuracy:.1f}% - MEASURED" if model_metrics else "NOT TRAINED"
+        st.markdown(f'''
         <div class="diagnostic-box">
             <div style="color: #00ff41; font-weight: bold;">MODEL ACCURACY</div>
             <div class="progress-bar" style="background: #333; height: 20px; border-radius: 10px; margin: 10px 0;">
-                <div style="background: linear-gradient(90deg, #ff6b35, #f7931e); width: 94%; height: 100%; border-radius: 10px;"></div>
+                <div style="background: linear-gradient(90deg, #ff6b35, #f7931e); width: {accuracy:.0f}%; height: 100%; border-radius: 10px;"></div>
             </div>
-            <div style="color: #ff6b35;">94% - OPTIMAL</div>
+            <div style="color: #ff6b35;">{accuracy_status}</div>
         </div>
         ''', unsafe_allow_html=True)
     
@@ -552,8 +1740,13 @@ def show_home():
         </div>
         ''', unsafe_allow_html=True)
     
-    # Recent alerts with enhanced styling and ASCII art
-    st.markdown('''
+    # Recent alerts with enhanced styling and ASCII art, newest first from the counter buffer
+    alert_rows = "<br>\n        ".join(
+        f"│ {alert['time']} │ <span style=\"color: {ALERT_COLORS[alert['priority']]};\">{alert['priority']}</span>{' ' * (8 - len(alert['priority']))} │ "
+        f"{escape(alert['message'][:ALERT_MESSAGE_WIDTH]):<{ALERT_MESSAGE_WIDTH}} │"
+        for alert in reversed(counters['alerts'][-ALERTS_SHOWN:])
+    ) + "<br>"
+    st.markdown(f'''
     <div class="retro-terminal">
         <div style="text-align: center; margin-bottom: 15px;">
             <div style="color: #ff6b35; font-size: 1.3rem; font-family: 'VT323', monospace;">⚠ RECENT SYSTEM ALERTS ⚠</div>
@@ -562,17 +1755,11 @@ def show_home():
         ┌─────────────────────────────────────────────────────────────────┐<br>
         │ TIME     │ PRIORITY │ MESSAGE                                   │<br>
         ├─────────────────────────────────────────────────────────────────┤<br>
-        │ 11:45:23 │ <span style="color: #ff4444;">HIGH</span>     │ TSH LEVEL CRITICAL - Patient THY-0847      │<br>
-        │ 11:42:15 │ <span style="color: #00ff41;">INFO</span>     │ Lab batch #2847 uploaded - 15 patients     │<br>
-        │ 11:38:09 │ <span style="color: #ff6b35;">MEDIUM</span>   │ AI model retrained - Accuracy: 94.8%       │<br>
-        │ 11:35:44 │ <span style="color: #00ff41;">INFO</span>     │ Backup completed - 1.2GB archived          │<br>
-        │ 11:30:12 │ <span style="color: #00ff41;">INFO</span>     │ System scan complete - No anomalies        │<br>
-        │ 11:28:07 │ <span style="color: #ff6b35;">MEDIUM</span>   │ Database optimization running...            │<br>
-        │ 11:25:33 │ <span style="color: #ff4444;">HIGH</span>     │ Abnormal T4 detected - Patient THY-0923    │<br>
+        {alert_rows}
         └─────────────────────────────────────────────────────────────────┘
         </div>
         <div style="color: #888; font-size: 0.9rem; text-align: center; margin-top: 10px;">
-            Alert buffer: 47/100 | Auto-refresh: ENABLED | Sound alerts: OFF
+            Alert buffer: {len(counters['alerts'])}/{ALERT_BUFFER_SIZE} | Auto-refresh: ENABLED | Sound alerts: OFF
         </div>
     </div>
     ''', unsafe_allow_html=True)
@@ -597,15 +1784,15 @@ def show_home():
 def show_data_analysis():
     st.markdown('<h2 class="section-header">📊 PATIENT DATABASE - THYROID ANALYSIS</h2>', unsafe_allow_html=True)
     
-    # Generate thyroid data
-    df = generate_thyroid_data()
+    # Open the columnar patient store
+    meta = ensure_patient_store()
     
-    st.markdown('''
+    st.markdown(f'''
     <div class="retro-terminal">
         > ACCESSING PATIENT DATABASE...<br>
         > LOADING THYROID RECORDS...<br>
         > DATABASE CONNECTION: ESTABLISHED<br>
-        > RECORDS LOADED: 500 PATIENTS
+        > RECORDS ON FILE: {meta['rows']:,} PATIENTS
     </div>
     ''', unsafe_allow_html=True)
     
@@ -619,40 +1806,37 @@ def show_data_analysis():
     # Age range filter
     age_range = st.sidebar.slider(
         "Age Range",
-        min_value=int(df['Age'].min()),
-        max_value=int(df['Age'].max()),
-        value=(int(df['Age'].min()), int(df['Age'].max()))
+        min_value=meta['age_min'],
+        max_value=meta['age_max'],
+        value=(meta['age_min'], meta['age_max'])
     )
     
     # Gender filter
     genders = st.sidebar.multiselect(
         "Gender",
-        options=df['Gender'].unique(),
-        default=df['Gender'].unique()
+        options=meta['categories']['Gender'],
+        default=meta['categories']['Gender']
     )
     
     # Diagnosis filter
     diagnoses = st.sidebar.multiselect(
         "Diagnosis",
-        options=df['Diagnosis'].unique(),
-        default=df['Diagnosis'].unique()
+        options=meta['categories']['Diagnosis'],
+        default=meta['categories']['Diagnosis']
     )
     
     # Risk level filter
     risk_levels = st.sidebar.multiselect(
         "Risk Level",
-        options=df['Risk_Level'].unique(),
-        default=df['Risk_Level'].unique()
+        options=meta['categories']['Risk_Level'],
+        default=meta['categories']['Risk_Level']
     )
     
-    # Apply filters
-    filtered_df = df[
-        (df['Age'] >= age_range[0]) & 
-        (df['Age'] <= age_range[1]) &
-        (df['Gender'].isin(genders)) &
-        (df['Diagnosis'].isin(diagnoses)) &
-        (df['Risk_Level'].isin(risk_levels))
-    ]
+    # Apply filters through the cached index
+    # Filters resolve to a packed bitmap; the metrics below are popcounts, not row scans
+    index = load_patient_index(str(PATIENT_STORE_DIR), meta['version'])
+    bitmap = index.bitmap(age_range, genders, diagnoses, risk_levels)
+    total = index.count(bitmap)
     
     # Display metrics in retro style
     col1, col2, col3, col4 = st.columns(4)
@@ -661,12 +1845,13 @@ def show_data_analysis():
         st.markdown(f'''
         <div class="diagnostic-box">
             <div style="color: #00ff41; font-weight: bold; text-align: center;">TOTAL PATIENTS</div>
-            <div style="color: #ff6b35; font-size: 1.5rem; text-align: center;">{len(filtered_df)}</div>
+            <div style="color: #ff6b35; font-size: 1.5rem; text-align: center;">{total:,}</div>
         </div>
         ''', unsafe_allow_html=True)
     
     with col2:
-        avg_tsh = filtered_df['TSH'].mean()
+        mask = np.unpackbits(bitmap, count=index.n_rows).view(bool)
+        avg_tsh = index.values('TSH').to_numpy()[mask].mean() if total else float('nan')
         st.markdown(f'''
         <div class="diagnostic-box">
             <div style="color: #00ff41; font-weight: bold; text-align: center;">AVG TSH</div>
@@ -675,40 +1860,59 @@ def show_data_analysis():
         ''', unsafe_allow_html=True)
     
     with col3:
-        abnormal_count = len(filtered_df[filtered_df['Diagnosis'] != 'Normal'])
+        abnormal_count = index.count(bitmap, 'Diagnosis', [d for d in meta['categories']['Diagnosis'] if d != 'Normal'])
         st.markdown(f'''
         <div class="diagnostic-box">
             <div style="color: #00ff41; font-weight: bold; text-align: center;">ABNORMAL CASES</div>
-            <div style="color: #ff6b35; font-size: 1.5rem; text-align: center;">{abnormal_count}</div>
+            <div style="color: #ff6b35; font-size: 1.5rem; text-align: center;">{abnormal_count:,}</div>
         </div>
         ''', unsafe_allow_html=True)
     
     with col4:
-        high_risk = len(filtered_df[filtered_df['Risk_Level'] == 'High'])
+        high_risk = index.count(bitmap, 'Risk_Level', ['High'])
         st.markdown(f'''
         <div class="diagnostic-box">
             <div style="color: #00ff41; font-weight: bold; text-align: center;">HIGH RISK</div>
-            <div style="color: #ff6b35; font-size: 1.5rem; text-align: center;">{high_risk}</div>
+            <div style="color: #ff6b35; font-size: 1.5rem; text-align: center;">{high_risk:,}</div>
         </div>
         ''', unsafe_allow_html=True)
     
     # Data table with styling
     st.markdown('<h3 style="color: #00ff41; font-family: \'Courier Prime\', monospace;">📋 FILTERED PATIENT RECORDS</h3>', unsafe_allow_html=True)
     
-    # Configure the dataframe display
+    # Sorting and paging happen here; only the visible page is sent to the browser
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
+    with col1:
+        sort_by = st.selectbox("Sort By", index.columns, key="patient_sort")
+    with col2:
+        ascending = st.radio("Order", ["Ascending", "Descending"], horizontal=True, key="patient_order") == "Ascending"
+    with col3:
+        page_size = st.selectbox("Rows Per Page", PATIENT_PAGE_SIZES, index=1, key="patient_page_size")
+    pages = max(1, -(-total // page_size))
+    with col4:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1, key="patient_page")
+    page = min(page, pages) - 1
+    
+    page_df = page_patient_store(meta, bitmap, sort_by, ascending, page, page_size)
     st.dataframe(
-        filtered_df,
+        page_df,
         use_container_width=True,
-        height=400
+        height=400,
+        hide_index=True,
+        column_config=PATIENT_COLUMN_CONFIG
     )
-    
-    # Download button with retro styling
-    csv = filtered_df.to_csv(index=False)
-    st.download_button(
-        label="💾 DOWNLOAD PATIENT DATA",
-        data=csv,
-        file_name=f"thyroid_patients_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-        mime="text/csv"
+    first = page * page_size + 1 if total else 0
+    st.caption(f"Rows {first:,}-{page * page_size + len(page_df):,} of {total:,} | Page {page + 1:,} of {pages:,}")
+    
+    # Download button with retro styling (the file is built only when clicked)
+    dataset = open_patient_store(str(PATIENT_STORE_DIR), meta['version'])
+    expression = patient_filter_expression(age_range, genders, diagnoses, risk_levels)
+    export_button(
+        "💾 DOWNLOAD PATIENT DATA",
+        lambda: dataset.to_batches(filter=expression, batch_size=EXPORT_BATCH_ROWS),
+        dataset.schema,
+        f"thyroid_patients_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        key="patient_export"
     )
 
 def show_widgets():
@@ -722,6 +1926,12 @@ def show_widgets():
     </div>
     ''', unsafe_allow_html=True)
     
+    # Input widgets and the analysis live in one fragment, so a slider drag
+    # reruns only this panel instead of the whole script
+    lab_results_panel()
+
+@st.fragment
+def lab_results_panel():
     col1, col2 = st.columns(2)
     
     with col1:
@@ -752,12 +1962,20 @@ def show_widgets():
     with col2:
         st.markdown('<h3 style="color: #00ff41; font-family: \'Courier Prime\', monospace;">🖥️ DIAGNOSTIC ANALYSIS</h3>', unsafe_allow_html=True)
         
-        # Real-time diagnosis based on TSH levels
-        if tsh_level < 0.4:
+        # Real-time diagnosis and risk from the scoring engine
+        scores = score_lab_results(pd.DataFrame({
+            'TSH': [tsh_level],
+            'Age': [patient_age],
+            'Goitre': [goitre],
+            'Tumor': [tumor],
+            'Psych': [psych],
+        })).iloc[0]
+        
+        if scores['Diagnosis'] == 'Hyperthyroid':
             diagnosis = "HYPERTHYROID"
             color = "#ff4444"
             status = "⚠ ABNORMAL"
-        elif tsh_level > 4.0:
+        elif scores['Diagnosis'] == 'Hypothyroid':
             diagnosis = "HYPOTHYROID"
             color = "#ff6b35"
             status = "⚠ ABNORMAL"
@@ -775,27 +1993,9 @@ def show_widgets():
         ''', unsafe_allow_html=True)
         
         # Risk assessment
-        risk_factors = 0
-        if tsh_level < 0.4 or tsh_level > 4.0:
-            risk_factors += 2
-        if goitre == "Yes":
-            risk_factors += 1
-        if tumor == "Yes":
-            risk_factors += 2
-        if patient_age > 60:
-            risk_factors += 1
-        if psych == "Yes":
-            risk_factors += 1
-        
-        if risk_factors >= 4:
-            risk_level = "HIGH"
-            risk_color = "#ff4444"
-        elif risk_factors >= 2:
-            risk_level = "MEDIUM"
-            risk_color = "#ff6b35"
-        else:
-            risk_level = "LOW"
-            risk_color = "#00ff41"
+        risk_factors = int(scores['Risk_Score'])
+        risk_level = scores['Risk_Level'].upper()
+        risk_color = RISK_COLORS[scores['Risk_Level']]
         
         st.markdown(f'''
         <div class="diagnostic-box">
@@ -809,10 +2009,10 @@ def show_widgets():
         st.markdown('<h4 style="color: #ff6b35; font-family: \'Courier Prime\', monospace;">📊 LAB VALUES SUMMARY</h4>', unsafe_allow_html=True)
         
         results_data = {
-            'Test': ['TSH', 'T3', 'T4', 'T4U', 'FTI'],
+            'Test': THYROID_COLUMNS,
             'Value': [f"{tsh_level:.2f}", f"{t3_level:.2f}", f"{t4_level:.2f}", f"{t4u_level:.2f}", f"{fti_level:.2f}"],
-            'Unit': ['mIU/L', 'ng/dL', 'μg/dL', 'ratio', 'index'],
-            'Reference': ['0.4-4.0', '0.8-2.8', '4.5-12.0', '0.8-1.2', '4.5-12.0']
+            'Unit': [LAB_SCHEMA[col]['unit'] for col in THYROID_COLUMNS],
+            'Reference': [reference_label(col) for col in THYROID_COLUMNS]
         }
         
         results_df = pd.DataFrame(results_data)
@@ -835,9 +2035,13 @@ def show_widgets():
         st.markdown('</div>', unsafe_allow_html=True)
 
 def show_charts():
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     st.markdown('<h2 class="section-header">📈 DIAGNOSTIC CHARTS - THYROID DATA VISUALIZATION</h2>', unsafe_allow_html=True)
     
-    df = generate_thyroid_data()
+    meta = ensure_patient_store()
+    n_patients = meta['rows']
     
     st.markdown('''
     <div class="retro-terminal">
@@ -871,10 +2075,12 @@ def show_charts():
         if chart_type == "TSH Distribution":
             fig = go.Figure()
             
-            # Create histogram
-            fig.add_trace(go.Histogram(
-                x=df['TSH'],
-                nbinsx=bins,
+            # Create histogram from the pre-binned summary
+            centers, widths, counts = load_hormone_summary(str(PATIENT_STORE_DIR), meta['version']).histogram(bins)
+            fig.add_trace(go.Bar(
+                x=centers,
+                y=counts,
+                width=widths,
                 name='TSH Distribution',
                 marker_color='rgba(0, 255, 65, 0.7)',
                 marker_line=dict(color='#00ff41', width=2)
@@ -901,7 +2107,10 @@ def show_charts():
             
         elif chart_type == "Hormone Correlation":
             # Create correlation matrix
-            corr_data = df[['TSH', 'T3', 'T4', 'T4U', 'FTI', 'Age']].corr(method=correlation_method)
+            if correlation_method == "pearson":
+                corr_data = load_hormone_summary(str(PATIENT_STORE_DIR), meta['version']).correlation()
+            else:
+                corr_data = load_spearman_correlation(str(PATIENT_STORE_DIR), meta['version'])
             
             fig = go.Figure(data=go.Heatmap(
                 z=corr_data.values,
@@ -926,22 +2135,28 @@ def show_charts():
             
         elif chart_type == "Diagnosis by Age":
             if age_groups:
-                # Create age groups
-                df_copy = df.copy()
-                df_copy['Age_Group'] = pd.cut(df_copy['Age'], 
-                                            bins=[0, 30, 45, 60, 100], 
-                                            labels=['18-30', '31-45', '46-60', '60+'])
+                # Create age groups, counted on the server so only the group totals reach the browser
+                df = load_patient_columns(str(PATIENT_STORE_DIR), meta['version'], ('Age', 'Diagnosis'))
+                age_group = pd.cut(df['Age'], 
+                                   bins=[0, 30, 45, 60, 100], 
+                                   labels=['18-30', '31-45', '46-60', '60+'])
+                age_diag = df.assign(Age_Group=age_group).groupby(['Age_Group', 'Diagnosis'], observed=True).size().reset_index(name='Count')
                 
-                fig = px.histogram(df_copy, x='Age_Group', color='Diagnosis',
-                                 title="Thyroid Diagnosis Distribution by Age Group",
-                                 color_discrete_map={
-                                     'Normal': '#00ff41',
-                                     'Hyperthyroid': '#ff6b35',
-                                     'Hypothyroid': '#ff4444'
-                                 })
+                fig = px.bar(age_diag, x='Age_Group', y='Count', color='Diagnosis',
+                            title="Thyroid Diagnosis Distribution by Age Group",
+                            color_discrete_map={
+                                'Normal': '#00ff41',
+                                'Hyperthyroid': '#ff6b35',
+                                'Hypothyroid': '#ff4444'
+                            })
             else:
-                fig = px.scatter(df, x='Age', y='TSH', color='Diagnosis',
+                # Large cohorts are reduced on the server and drawn with WebGL
+                plot_df = sample_patient_points(str(PATIENT_STORE_DIR), meta['version'], ('Age', 'TSH'))
+                if len(plot_df) < n_patients:
+                    st.caption(f"Showing a density-preserving sample of {len(plot_df):,} / {n_patients:,} patients")
+                fig = px.scatter(plot_df, x='Age', y='TSH', color='Diagnosis',
                                title="TSH Levels vs Age by Diagnosis",
+                               render_mode='webgl',
                                color_discrete_map={
                                    'Normal': '#00ff41',
                                    'Hyperthyroid': '#ff6b35',
@@ -959,6 +2174,7 @@ def show_charts():
             
         elif chart_type == "Gender Analysis":
             # Gender distribution by diagnosis
+            df = load_patient_columns(str(PATIENT_STORE_DIR), meta['version'], ('Gender', 'Diagnosis'))
             gender_diag = df.groupby(['Gender', 'Diagnosis']).size().reset_index(name='Count')
             
             fig = px.bar(gender_diag, x='Gender', y='Count', color='Diagnosis',
@@ -980,6 +2196,7 @@ def show_charts():
             
         elif chart_type == "Risk Factor Matrix":
             # Risk factors analysis
+            df = load_patient_columns(str(PATIENT_STORE_DIR), meta['version'], ('Risk_Level', 'Diagnosis'))
             risk_data = df.groupby(['Risk_Level', 'Diagnosis']).size().reset_index(name='Count')
             
             fig = px.sunburst(risk_data, path=['Risk_Level', 'Diagnosis'], values='Count',
@@ -1000,20 +2217,23 @@ def show_charts():
             st.plotly_chart(fig, use_container_width=True)
             
         elif chart_type == "3D Hormone Plot":
-            # 3D scatter plot of hormone levels
+            # 3D scatter plot of hormone levels (voxel-binned sample above the point limit)
+            plot_df = sample_patient_points(str(PATIENT_STORE_DIR), meta['version'], ('TSH', 'T3', 'T4'))
+            if len(plot_df) < n_patients:
+                st.caption(f"Showing a density-preserving sample of {len(plot_df):,} / {n_patients:,} patients")
             fig = go.Figure(data=[go.Scatter3d(
-                x=df['TSH'],
-                y=df['T3'],
-                z=df['T4'],
+                x=plot_df['TSH'],
+                y=plot_df['T3'],
+                z=plot_df['T4'],
                 mode='markers',
                 marker=dict(
                     size=5,
-                    color=df['Age'],
+                    color=plot_df['Age'],
                     colorscale='Viridis',
                     opacity=0.8,
                     colorbar=dict(title="Age")
                 ),
-                text=df['Diagnosis'],
+                text=plot_df['Diagnosis'],
                 hovertemplate='<b>TSH:</b> %{x:.2f}<br><b>T3:</b> %{y:.2f}<br><b>T4:</b> %{z:.2f}<br><b>Diagnosis:</b> %{text}<extra></extra>'
             )])
             
@@ -1053,7 +2273,7 @@ def show_file_upload():
     
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
+            profile = load_upload_profile(uploaded_file)
             
             st.markdown('''
             <div class="diagnostic-box">
@@ -1069,25 +2289,26 @@ def show_file_upload():
                 st.markdown(f'''
                 <div class="diagnostic-box">
                     <div style="color: #00ff41; font-weight: bold;">📊 DATASET INFORMATION</div>
-                    <div style="color: #ff6b35;">Patients: {df.shape[0]}</div>
-                    <div style="color: #ff6b35;">Data Fields: {df.shape[1]}</div>
-                    <div style="color: #ff6b35;">Memory: {df.memory_usage(deep=True).sum() / 1024:.2f} KB</div>
+                    <div style="color: #ff6b35;">Patients: {profile.rows}</div>
+                    <div style="color: #ff6b35;">Data Fields: {len(profile.dtypes)}</div>
+                    <div style="color: #ff6b35;">Memory (as parsed): {profile.memory_bytes / 1024:.2f} KB ({profile.memory_bytes / max(profile.rows, 1):.0f} B/row)</div>
+                    <div style="color: #00ff41;">Memory (compact): {profile.compact_bytes / 1024:.2f} KB ({profile.compact_bytes / max(profile.rows, 1):.0f} B/row)</div>
+                    <div style="color: #888;">Reduction: {profile.memory_bytes / max(profile.compact_bytes, 1):.1f}×</div>
                 </div>
                 ''', unsafe_allow_html=True)
             
             with col2:
                 st.markdown('<h4 style="color: #ff6b35; font-family: \'Courier Prime\', monospace;">🔍 COLUMN ANALYSIS</h4>', unsafe_allow_html=True)
-                column_types = df.dtypes.to_frame('Data Type').reset_index()
+                column_types = profile.dtypes.astype(str).to_frame('Data Type').reset_index()
                 column_types.columns = ['Column', 'Type']
                 st.dataframe(column_types, use_container_width=True, hide_index=True)
             
             # Data preview with retro styling
             st.markdown('<h3 style="color: #00ff41; font-family: \'Courier Prime\', monospace;">📋 DATA PREVIEW</h3>', unsafe_allow_html=True)
-            st.dataframe(df.head(10), use_container_width=True)
+            st.dataframe(profile.preview, use_container_width=True, column_config=patient_column_config(profile.preview))
             
             # Thyroid-specific analysis if appropriate columns exist
-            thyroid_columns = ['TSH', 'T3', 'T4', 'T4U', 'FTI']
-            found_columns = [col for col in thyroid_columns if col in df.columns]
+            found_columns = [col for col in THYROID_COLUMNS if col in profile.dtypes.index]
             
             if found_columns:
                 st.markdown('''
@@ -1100,14 +2321,11 @@ def show_file_upload():
                 # Statistical summary for hormone data
                 if st.checkbox("📊 Show Hormone Statistics", value=True):
                     st.markdown('<h4 style="color: #ff6b35; font-family: \'Courier Prime\', monospace;">📈 HORMONE LEVEL STATISTICS</h4>', unsafe_allow_html=True)
-                    hormone_stats = df[found_columns].describe()
+                    hormone_stats = profile.describe(found_columns)
                     st.dataframe(hormone_stats, use_container_width=True)
                     
                     # Check for abnormal values
-                    abnormal_count = 0
-                    if 'TSH' in df.columns:
-                        abnormal_tsh = len(df[(df['TSH'] < 0.4) | (df['TSH'] > 4.0)])
-                        abnormal_count += abnormal_tsh
+                    abnormal_count = profile.validator.abnormal('TSH')
                         
                     if abnormal_count > 0:
                         st.markdown(f'''
@@ -1116,15 +2334,57 @@ def show_file_upload():
                             <div style="color: #ff4444; text-align: center;">{abnormal_count} patients with abnormal TSH levels</div>
                         </div>
                         ''', unsafe_allow_html=True)
+                    
+                    if profile.risk_counts is not None:
+                        st.markdown('<h4 style="color: #ff6b35; font-family: \'Courier Prime\', monospace;">⚕️ DIAGNOSIS × RISK LEVEL</h4>', unsafe_allow_html=True)
+                        st.dataframe(profile.risk_counts, use_container_width=True)
+            
+            # Schema and reference-range validation, computed while the file was parsed
+            if profile.validator.columns:
+                st.markdown('<h4 style="color: #ff6b35; font-family: \'Courier Prime\', monospace;">🧾 SCHEMA VALIDATION</h4>', unsafe_allow_html=True)
+                st.dataframe(profile.validator.summary(), use_container_width=True)
+                
+                rows, _ = profile.validator.violation_index()
+                flagged = len(rows)
+                color = "#ff6b35" if flagged else "#00ff41"
+                st.markdown(f'''
+                <div class="diagnostic-box">
+                    <div style="color: #00ff41; font-weight: bold; text-align: center;">ROWS WITH VIOLATIONS</div>
+                    <div style="color: {color}; font-size: 1.5rem; text-align: center;">{flagged:,} / {profile.rows:,}</div>
+                </div>
+                ''', unsafe_allow_html=True)
+                if flagged:
+                    st.caption(f"First {min(flagged, VIOLATION_PREVIEW_ROWS)} flagged rows (invalid = outside physiologic bounds or wrong format; low/high = outside reference range)")
+                    st.dataframe(profile.validator.violations(), use_container_width=True, hide_index=True, height=300)
+            
+            # Batch inference with the diagnostic model
+            if 'TSH' in profile.dtypes.index and st.checkbox("🤖 Run AI Diagnostic Model"):
+                st.markdown('<h4 style="color: #ff6b35; font-family: \'Courier Prime\', monospace;">🤖 AI DIAGNOSTIC PREDICTIONS</h4>', unsafe_allow_html=True)
+                cache = get_upload_cache()
+                key = upload_digest(uploaded_file) + ":model"
+                predictions = cache.get(key)
+                if predictions is None:
+                    with st.spinner("Running diagnostic model..."):
+                        predictions = predict_csv(uploaded_file, load_diagnostic_model())
+                    cache.put(key, predictions, int(predictions['preview'].memory_usage(deep=True).sum()) + 1024)
+                st.markdown(f'''
+                <div class="diagnostic-box">
+                    <div style="color: #00ff41; font-weight: bold; text-align: center;">{predictions['rows']:,} PATIENTS SCORED</div>
+                    <div style="color: #ff6b35; text-align: center;">Inference: {predictions['latency_us_per_row']:.1f} µs per patient</div>
+                </div>
+                ''', unsafe_allow_html=True)
+                st.dataframe(predictions['counts'].to_frame('Patients'), use_container_width=True)
+                st.dataframe(predictions['preview'], use_container_width=True,
+                             column_config=patient_column_config(predictions['preview']))
             
             # Missing values analysis
             if st.checkbox("🔍 Check Missing Values"):
                 st.markdown('<h4 style="color: #ff6b35; font-family: \'Courier Prime\', monospace;">❓ MISSING DATA ANALYSIS</h4>', unsafe_allow_html=True)
-                missing_data = df.isnull().sum()
+                missing_data = profile.missing
                 if missing_data.sum() > 0:
                     missing_df = missing_data[missing_data > 0].to_frame('Missing Count').reset_index()
                     missing_df.columns = ['Column', 'Missing Count']
-                    missing_df['Percentage'] = (missing_df['Missing Count'] / len(df) * 100).round(2)
+                    missing_df['Percentage'] = (missing_df['Missing Count'] / profile.rows * 100).round(2)
                     st.dataframe(missing_df, use_container_width=True, hide_index=True)
                 else:
                     st.markdown('''
@@ -1153,13 +2413,15 @@ def show_file_upload():
         st.markdown('<h3 style="color: #00ff41; font-family: \'Courier Prime\', monospace;">💾 SAMPLE DATASET AVAILABLE</h3>', unsafe_allow_html=True)
         st.markdown("Don't have thyroid data? Download our sample dataset for testing:")
         
-        sample_df = generate_thyroid_data()
-        csv = sample_df.to_csv(index=False)
-        st.download_button(
-            label="💾 DOWNLOAD SAMPLE THYROID DATA",
-            data=csv,
-            file_name="sample_thyroid_data.csv",
-            mime="text/csv"
+        import pyarrow as pa
+        
+        sample_table = pa.Table.from_pandas(load_thyroid_cohort(), preserve_index=False)
+        export_button(
+            "💾 DOWNLOAD SAMPLE THYROID DATA",
+            lambda: sample_table.to_batches(max_chunksize=EXPORT_BATCH_ROWS),
+            sample_table.schema,
+            "sample_thyroid_data",
+            key="sample_export"
         )
 
 def show_form_demo():
@@ -1285,28 +2547,42 @@ def show_form_demo():
                 for error in errors:
                     st.error(f"❌ {error}")
             else:
-                # Calculate risk score
-                risk_score = 0
-                if family_history: risk_score += 2
-                if previous_thyroid: risk_score += 3
-                if autoimmune: risk_score += 2
-                if smoking: risk_score += 1
-                if radiation: risk_score += 2
-                if pregnancy: risk_score += 1
-                if fatigue in ["Moderate", "Severe"]: risk_score += 1
-                if weight_changes != "No": risk_score += 1
-                if heart_rate != "No": risk_score += 1
-                if temperature != "No": risk_score += 1
-                
-                # Lab-based assessment
-                lab_abnormal = False
-                if tsh_available and tsh_value:
-                    if tsh_value < 0.4 or tsh_value > 4.0:
-                        lab_abnormal = True
-                        risk_score += 3
+                # Calculate risk score with the scoring engine
+                registration = pd.DataFrame({
+                    'PatientID': [patient_id],
+                    'First_Name': [first_name],
+                    'Last_Name': [last_name],
+                    'Birth_Date': [birth_date.isoformat()],
+                    'Gender': [gender],
+                    'Phone': [phone],
+                    'Emergency_Contact': [emergency_contact],
+                    'Insurance_ID': [insurance_id],
+                    'Family_History': [family_history],
+                    'Previous_Thyroid': [previous_thyroid],
+                    'Medications': [medications],
+                    'Autoimmune': [autoimmune],
+                    'Smoking': [smoking],
+                    'Radiation': [radiation],
+                    'Pregnancy': [pregnancy],
+                    'Iodine_Deficiency': [iodine_deficiency],
+                    'Fatigue': [fatigue],
+                    'Weight_Changes': [weight_changes],
+                    'Heart_Rate': [heart_rate],
+                    'Temperature': [temperature],
+                    'TSH': [tsh_value if tsh_available else np.nan],
+                    'T3': [t3_value if t3_available else np.nan],
+                    'T4': [t4_value if t4_available else np.nan],
+                    'Notes': [additional_notes],
+                    'Newsletter': [newsletter],
+                })
+                scores = score_screening(registration)
+                persist_registrations(registration.join(scores))
+                scores = scores.iloc[0]
+                risk_score = int(scores['Risk_Score'])
+                lab_abnormal = bool(scores['Lab_Abnormal'])
                 
                 # Success message with risk assessment
-                st.success("✅ Patient record submitted successfully!")
+                st.success("✅ Patient record submitted and committed to disk!")
                 st.balloons()
                 
                 # Display submitted information
@@ -1321,15 +2597,8 @@ def show_form_demo():
                 st.write(f"**Gender:** {gender}")
                 
                 # Risk assessment display
-                if risk_score >= 8:
-                    risk_level = "HIGH"
-                    risk_color = "#ff4444"
-                elif risk_score >= 4:
-                    risk_level = "MEDIUM"
-                    risk_color = "#ff6b35"
-                else:
-                    risk_level = "LOW"
-                    risk_color = "#00ff41"
+                risk_level = scores['Risk_Level'].upper()
+                risk_color = RISK_COLORS[scores['Risk_Level']]
                 
                 st.markdown(f'''
                 <div class="diagnostic-box">
@@ -1363,6 +2632,89 @@ def show_form_demo():
                     st.write("🟢 Maintain healthy lifestyle")
                 
                 st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Bulk registration from intake spreadsheets, checked with the same rules as the form
+    st.markdown('<h3 style="color: #ff6b35; font-family: \'Courier Prime\', monospace;">📥 BULK REGISTRATION</h3>', unsafe_allow_html=True)
+    
+    st.download_button(
+        "📄 Download Intake Template",
+        data=",".join(REGISTRATION_TEMPLATE_COLUMNS) + "\n",
+        file_name="registration_template.csv",
+        mime="text/csv"
+    )
+    intake_file = st.file_uploader(
+        "Upload an intake spreadsheet",
+        type="csv",
+        key="bulk_registration",
+        help="One patient per row; consent columns accept Yes/No, True/False or 1/0"
+    )
+    
+    if intake_file is not None:
+        try:
+            digest = upload_digest(intake_file)
+            registrations = read_registrations(intake_file)
+            scored, report = check_registrations(registrations)
+            
+            col1, col2, col3 = st.columns(3)
+            for col, label, value in [
+                (col1, "ROWS READ", len(registrations)),
+                (col2, "READY TO REGISTER", len(scored)),
+                (col3, "REJECTED ROWS", report['Line'].nunique()),
+            ]:
+                with col:
+                    st.markdown(f'''
+                    <div class="diagnostic-box">
+                        <div style="color: #00ff41; font-weight: bold; text-align: center;">{label}</div>
+                        <div style="color: #ff6b35; font-size: 1.5rem; text-align: center;">{value:,}</div>
+                    </div>
+                    ''', unsafe_allow_html=True)
+            
+            if len(report):
+                st.markdown("**Validation Errors:**")
+                st.dataframe(report, use_container_width=True, hide_index=True, height=250)
+                st.download_button(
+                    "📥 Download Error Report",
+                    data=report.to_csv(index=False),
+                    file_name="registration_errors.csv",
+                    mime="text/csv"
+                )
+            
+            if len(scored):
+                st.markdown("**Risk Assessment of Valid Rows:**")
+                st.dataframe(
+                    scored['Risk_Level'].value_counts().reindex(list(RISK_COLORS), fill_value=0).rename('Patients').to_frame().T,
+                    use_container_width=True
+                )
+            
+            # Uploads are keyed by content so a rerun or re-upload cannot register the same file twice
+            registered = st.session_state.setdefault('registered_uploads', set())
+            if digest in registered:
+                st.info("ℹ️ This file has already been registered")
+            elif st.button(f"🏥 REGISTER {len(scored):,} PATIENTS", type="primary", disabled=scored.empty):
+                with st.spinner("Committing records..."):
+                    persist_registrations(scored, source="Bulk registration")
+                registered.add(digest)
+                st.success(f"✅ {len(scored):,} patient records committed to disk!")
+        
+        except Exception as e:
+            st.markdown(f'''
+            <div class="diagnostic-box">
+                <div style="color: #ff4444; font-weight: bold; text-align: center;">❌ INTAKE FILE ERROR</div>
+                <div style="color: #ff4444; text-align: center;">Error: {str(e)}</div>
+            </div>
+            ''', unsafe_allow_html=True)
+    
+    # Latest registrations, read back from the durable record log
+    with st.expander("🗄️ Recent Registrations"):
+        recent = get_record_log().records(limit=20)
+        if recent:
+            st.dataframe(
+                pd.DataFrame(recent)[['SubmittedAt', 'PatientID', 'First_Name', 'Last_Name', 'Gender', 'Risk_Score', 'Risk_Level']],
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("No patient records submitted yet")
 
 if __name__ == "__main__":
     main()
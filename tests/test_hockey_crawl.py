@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scraper_utils
+from benchmarks import fixture_hockey_server
+from scraper_utils import HTTPCache
+from web_scrapping import MAX_CONCURRENT_PAGES, crawl_teams
+
+
+def test_crawl_fetches_every_page_once_within_the_concurrency_limit(tmp_path, monkeypatch):
+    cache = HTTPCache(tmp_path / 'cache')
+    monkeypatch.setattr(scraper_utils, 'get_http_cache', lambda: cache)
+    server = fixture_hockey_server.start()
+    try:
+        pages = list(crawl_teams(fixture_hockey_server.start_url(server)))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(pages) == len({url for url, _ in pages}) == fixture_hockey_server.PAGES == 24
+    assert sum(len(teams['Team Name']) for _, teams in pages) == 600
+    assert server.stats['requests'] == fixture_hockey_server.PAGES
+    assert 1 < server.stats['peak'] <= MAX_CONCURRENT_PAGES
@@ -0,0 +1,36 @@
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simpleapp import generate_thyroid_data, patient_filter_expression, write_export
+
+
+def patient_dataset(tmp_path):
+    path = tmp_path / 'patients.parquet'
+    pq.write_table(pa.Table.from_pandas(generate_thyroid_data(n_samples=200), preserve_index=False), path)
+    return ds.dataset(path, format='parquet')
+
+
+def test_cleared_filter_exports_an_empty_csv(tmp_path):
+    dataset = patient_dataset(tmp_path)
+    expression = patient_filter_expression((18, 80), [], ['Normal'], ['Low'])
+
+    data = write_export(dataset.to_batches(filter=expression), dataset.schema, "CSV")
+    assert pd.read_csv(io.BytesIO(data)).empty
+
+
+def test_filter_matches_the_selected_values(tmp_path):
+    dataset = patient_dataset(tmp_path)
+    expression = patient_filter_expression((0, 120), ['Female'], ['Normal', 'Hypothyroid'], ['Low', 'Medium', 'High'])
+
+    table = dataset.to_table(filter=expression).to_pandas()
+    expected = dataset.to_table().to_pandas()
+    expected = expected[(expected['Gender'] == 'Female') & expected['Diagnosis'].isin(['Normal', 'Hypothyroid'])]
+    assert len(table) == len(expected) > 0
@@ -0,0 +1,30 @@
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simpleapp import compact_patient_frame, format_patient_ids
+
+
+def compact_ids(csv):
+    return compact_patient_frame(pd.read_csv(io.StringIO(csv)))['PatientID']
+
+
+def test_canonical_ids_are_integer_encoded():
+    ids = compact_ids("PatientID,TSH\nTHY-0001,1.2\nTHY-0420,3.4\n")
+    assert ids.dtype == 'int32'
+    assert format_patient_ids(ids).tolist() == ['THY-0001', 'THY-0420']
+
+
+def test_loose_ids_are_kept_verbatim():
+    ids = compact_ids("PatientID,TSH\nTHY-001,1\nTHY-0001,2\nTHY-1e3,3\nTHY- 7,4\n")
+    assert not pd.api.types.is_integer_dtype(ids)
+    assert format_patient_ids(ids).tolist() == ['THY-001', 'THY-0001', 'THY-1e3', 'THY- 7']
+
+
+def test_bare_numbers_are_not_given_a_prefix():
+    ids = compact_ids("PatientID,TSH\n7,1\n8,2\n")
+    assert format_patient_ids(ids).tolist() == ['7', '8']
@@ -0,0 +1,73 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from patient_records import RECORD_LOG_FILE, RecordLog
+
+
+def crash_mid_write(store_dir):
+    """Simulate a crash that left half of a line at the end of the log"""
+    with open(Path(store_dir) / RECORD_LOG_FILE, 'ab') as f:
+        f.write(b'{"seq": 2, "record": {"PatientID": "THY-')
+
+
+def test_torn_line_is_truncated_on_recovery(tmp_path):
+    log = RecordLog(tmp_path)
+    log.submit([{'PatientID': 'THY-0001'}])
+    log.close()
+    crash_mid_write(tmp_path)
+
+    log = RecordLog(tmp_path)
+    assert log.submit([{'PatientID': 'THY-0002'}, {'PatientID': 'THY-0003'}]) == [2, 3]
+    assert [r['PatientID'] for r in log.records()] == ['THY-0003', 'THY-0002', 'THY-0001']
+    log.compact()
+    assert log.count() == 3
+    log.close()
+
+    log = RecordLog(tmp_path)
+    assert log.count() == 3
+    assert [r['PatientID'] for r in log.records()] == ['THY-0003', 'THY-0002', 'THY-0001']
+    log.close()
+
+
+def test_failed_write_leaves_no_partial_line(tmp_path, monkeypatch):
+    log = RecordLog(tmp_path)
+    log.submit([{'PatientID': 'THY-0001'}])
+
+    def failing_fsync(fd):
+        raise OSError('disk full')
+    monkeypatch.setattr(os, 'fsync', failing_fsync)
+    with pytest.raises(OSError):
+        log.submit([{'PatientID': 'THY-0002'}])
+    monkeypatch.undo()
+
+    assert log.submit([{'PatientID': 'THY-0003'}]) == [2]
+    log.close()
+    log = RecordLog(tmp_path)
+    assert [r['PatientID'] for r in log.records()] == ['THY-0003', 'THY-0001']
+    log.close()
+
+
+def test_recent_records_span_the_log_and_the_table(tmp_path):
+    log = RecordLog(tmp_path)
+    log.submit([{'PatientID': f'THY-{i:04d}'} for i in range(1, 6)])
+    log.compact()
+    log.submit([{'PatientID': f'THY-{i:04d}'} for i in range(6, 9)])
+
+    assert [r['PatientID'] for r in log.records(limit=2)] == ['THY-0008', 'THY-0007']
+    assert [r['PatientID'] for r in log.records(limit=5)] == ['THY-0008', 'THY-0007', 'THY-0006', 'THY-0005', 'THY-0004']
+    assert len(log.records()) == 8
+    log.close()
+
+
+def test_recent_records_read_only_the_log_tail(tmp_path):
+    log = RecordLog(tmp_path, fsync=False)
+    log.submit([{'PatientID': f'THY-{i:04d}', 'Notes': 'x' * 200} for i in range(1, 2001)])
+
+    assert [r['PatientID'] for r in log.records(limit=3)] == ['THY-2000', 'THY-1999', 'THY-1998']
+    assert RecordLog._tail(open(log.log_path, 'rb'), log.log_path.stat().st_size, 0) == []
+    log.close()
@@ -0,0 +1,41 @@
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simpleapp import check_registrations, read_registrations, score_screening
+
+HEADER = "PatientID,First_Name,Last_Name,TSH,Consent_Treatment,Consent_Data,Consent_Contact\n"
+
+
+def intake(text):
+    return io.BytesIO((HEADER + text).encode('utf-8'))
+
+
+def test_report_lines_count_blank_lines():
+    registrations = read_registrations(intake(
+        "THY-0001,Ann,Lee,2.0,Yes,Yes,Yes\n"
+        "\n"
+        "THY-0002,,Roe,2.0,Yes,Yes,Yes\n"
+        "\n"
+        "\n"
+        "THY-0003,Sam,Poe,2.0,No,Yes,Yes\n"
+    ))
+    scored, report = check_registrations(registrations)
+
+    assert scored['PatientID'].tolist() == ['THY-0001']
+    assert report[['Line', 'PatientID']].values.tolist() == [[4, 'THY-0002'], [7, 'THY-0003']]
+
+
+def test_zero_tsh_is_scored_the_same_by_form_and_bulk_paths():
+    bulk = read_registrations(intake("THY-0001,Ann,Lee,0,Yes,Yes,Yes\n"))
+    scored, _ = check_registrations(bulk)
+    # The Patient Entry form passes the entered TSH through as a number when a result is available
+    form = score_screening(pd.DataFrame({'TSH': [0.0]}))
+
+    assert scored['Lab_Abnormal'].tolist() == form['Lab_Abnormal'].tolist() == [True]
+    assert not score_screening(pd.DataFrame({'TSH': [np.nan]}))['Lab_Abnormal'].any()
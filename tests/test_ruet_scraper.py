@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scraper_utils
+import web_scrapping4
+from benchmarks import fixture_ruet_server
+from scraper_utils import HTTPCache, SnapshotStore
+
+
+@pytest.fixture
+def ruet(tmp_path, monkeypatch):
+    """Stand-in RUET server, with the scraper pointed at it through an empty cache and snapshot store"""
+    server = fixture_ruet_server.start()
+    cache = HTTPCache(tmp_path / 'cache')
+    store = SnapshotStore(tmp_path / 'snapshots.sqlite')
+    monkeypatch.setattr(web_scrapping4, 'URL_TEMPLATE', fixture_ruet_server.url_template(server))
+    monkeypatch.setattr(scraper_utils, 'get_http_cache', lambda: cache)
+    monkeypatch.setattr(web_scrapping4, 'get_snapshot_store', lambda: store)
+    web_scrapping4.get_department.clear()
+    yield server, cache
+    web_scrapping4.get_department.clear()
+    server.shutdown()
+    server.server_close()
+
+
+def test_all_departments_load_with_flaky_ones_retried(ruet):
+    server, _ = ruet
+    data, errors = web_scrapping4.get_all_data(web_scrapping4.DESIGNATIONS)
+
+    assert errors == {}
+    assert sorted(data['Department'].unique()) == sorted(web_scrapping4.DEPTS)
+    assert len(data) == len(web_scrapping4.DEPTS) * fixture_ruet_server.TEACHERS_PER_DEPT
+    flaky = fixture_ruet_server.FLAKY_DEPTS
+    assert server.stats['failed'] == {dept: fixture_ruet_server.FAILURES_PER_FLAKY_DEPT for dept in flaky}
+    assert server.stats['requests'] == len(web_scrapping4.DEPTS) + len(flaky) * fixture_ruet_server.FAILURES_PER_FLAKY_DEPT
+
+
+def test_stale_page_is_revalidated_with_a_304(ruet):
+    server, cache = ruet
+    cache.ttl = 0  # every cached copy is stale at once
+    url = web_scrapping4.URL_TEMPLATE.format(dept='eee')
+
+    body, digest = cache.fetch(url)
+    assert cache.fetch(url) == (body, digest)
+    assert server.stats['not_modified'] == 1
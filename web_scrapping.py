@@ -1,38 +1,45 @@
+import os
 import streamlit as st
-from bs4 import BeautifulSoup
-import requests
 import pandas as pd
+from scraper_utils import crawl_pages, extract_table
 
 
-st.title("Web Scraping App")
+# Point HOCKEY_URL at a local server to run against fixture pages
+HOCKEY_URL = os.environ.get('HOCKEY_URL', 'https://www.scrapethissite.com/pages/forms/?page_num=1')
+PAGINATION_XPATH = '//ul[contains(@class, "pagination")]//a/@href'
+TEAM_COLUMNS = {'Team Name': 0, 'Year': 1, 'Wins': 2}
+MAX_CONCURRENT_PAGES = 4
 
-url = requests.get(f'https://www.scrapethissite.com/pages/forms/').text
-soup = BeautifulSoup(url, 'lxml')
 
-players = soup.find_all('tr')
+def parse_teams(html):
+    # Team rows only, one pass per row
+    return extract_table(html, TEAM_COLUMNS, row_xpath='//table//tr[contains(@class, "team")]', skip_rows=0)
 
-#st.write(players)
-players = soup.find_all('tr')[1:]
 
-#st.write([players[0]])
-team_name = []
-year_number = []
-wins_number = []
+def crawl_teams(start_url=HOCKEY_URL, max_workers=MAX_CONCURRENT_PAGES):
+    """Yield each page's team rows as the paginated crawl progresses"""
+    return crawl_pages(start_url, parse_teams, PAGINATION_XPATH, max_workers=max_workers)
 
-for player in players:
-    name = player.find_all('td')[0].text.strip()
-    year = player.find_all('td')[1].text.strip()
-    wins = player.find_all('td')[2].text.strip()
-    team_name.append(name)
-    year_number.append(year)
-    wins_number.append(wins)
 
-data = pd.DataFrame({
-    'Team Name': team_name,
-    'Year': year,
-    'Wins': wins
-})
+def main():
+    st.title("Web Scraping App")
 
-#st.dataframe(data)
-st.table(data)
+    status = st.empty()
+    table = st.empty()
 
+    # Grow the table page by page while the crawl continues
+    columns = {name: [] for name in TEAM_COLUMNS}
+    pages = 0
+    for url, rows in crawl_teams():
+        pages += 1
+        for name, values in rows.items():
+            columns[name].extend(values)
+        data = pd.DataFrame(columns)
+        status.text(f'Crawled {pages} pages - {len(data)} teams')
+        table.dataframe(data)
+
+    #st.dataframe(data)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,76 +1,96 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-from bs4 import BeautifulSoup
 import requests
 import pandas as pd
+from scraper_utils import CACHE_TTL, extract_table, fetch_cached, get_session, get_snapshot_store
 
 
-def get_data(dept, designs):
-    url = requests.get(f'https://www.{dept}.ruet.ac.bd/teacher_list').text
-    soup = BeautifulSoup(url, 'lxml')
-    teachers = soup.find_all('tr')[1:]
-
-    names_en = []
-    designations = []
-    emails = []
-    phones = []
-    departments = []
-
-    for teacher in teachers:
-        name_en = teacher.find_all('td')[1].text.strip()
-        designation = teacher.find_all('td')[3].text.strip()
-        email = teacher.find_all('td')[5].text.strip()
-        phone = teacher.find_all('td')[6].text.strip()
-        department = teacher.find_all('td')[4].text.strip()
-        if designs:
-            if designation in designs:
-                names_en.append(name_en)
-                designations.append(designation)
-                emails.append(email)
-                phones.append(phone)
-                departments.append(department)
-
-        
-    data = pd.DataFrame({
-        'Name': names_en,
-        'Designation': designations,
-        'Email': emails,
-        'Phone': phones,
-        'Department': departments
-        })
-    return data
+DEPTS = ['EEE', 'CSE', 'ETE', 'ECE', 'CHEM', 'MATH', 'PHY', 'IPE', 'CHE', 'BECM', 'ME', 'URP', 'ARCHI', 'CE']
+ALL_DEPTS = 'ALL'
+
+# Point RUET_URL_TEMPLATE at a local server to run against fixture pages
+URL_TEMPLATE = os.environ.get('RUET_URL_TEMPLATE', 'https://www.{dept}.ruet.ac.bd/teacher_list')
+
+
+TEACHER_COLUMNS = {'Name': 1, 'Designation': 3, 'Email': 5, 'Phone': 6, 'Department': 4}
+TEACHER_KEY = ['Email', 'Name']
+DESIGNATIONS = ['Professor', 'Assistant Professor', 'Associate Professor', 'Lecturer', 'Senior Lecturer', 'Instructor']
+
+
+def parse_teachers(html):
+    return pd.DataFrame(extract_table(html, TEACHER_COLUMNS), columns=list(TEACHER_COLUMNS))
+
+
+@st.cache_data(show_spinner=False, max_entries=1024)
+def select_designations(dept, digest, designs, _data):
+    """Vectorized designation filter, memoized per (department, page digest, selection); no selection means no filter"""
+    if not designs:
+        return _data
+    return _data[_data['Designation'].isin(designs)].reset_index(drop=True)
+
+
+def sync_department(dept, session=None):
+    """Fetch a department page and fold it into the snapshot store; only changed rows are written"""
+    html, digest = fetch_cached(URL_TEMPLATE.format(dept=dept), session)
+    store = get_snapshot_store()
+    if store.last_digest(dept) != digest:
+        store.apply(dept, parse_teachers(html), TEACHER_KEY, page_digest=digest)
+    return digest
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner='Fetching department...')
+def get_department(dept, _session=None):
+    """Full department table, fetched once per cache TTL; returns (page digest, data)"""
+    digest = sync_department(dept, _session)
+    data = get_snapshot_store().load(dept).reindex(columns=list(TEACHER_COLUMNS))
+    extra = sorted(set(data['Designation']) - set(DESIGNATIONS))
+    data['Designation'] = pd.Categorical(data['Designation'], categories=DESIGNATIONS + extra)
+    return digest, data
+
+
+def get_data(dept, designs, session=None):
+    digest, data = get_department(dept, session)
+    return select_designations(dept, digest, tuple(designs), data)
+
+
+def get_all_data(designs, depts=DEPTS, session=None, max_workers=len(DEPTS)):
+    """Fetch every department concurrently over one pooled session; returns (data, {dept: error})"""
+    session = session or get_session()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {dept: pool.submit(get_data, dept.lower(), designs, session) for dept in depts}
+
+    frames = []
+    errors = {}
+    for dept, future in futures.items():
+        try:
+            frames.append(future.result())
+        except requests.RequestException as e:
+            errors[dept] = str(e)
+    data = pd.concat(frames, ignore_index=True) if frames else parse_teachers('')
+    return data, errors
 
 
 
 def main():
     st.title('RUET Teachers\' Information')
     #department selection
-    depts = ['EEE', 'CSE', 'ETE', 'ECE', 'CHEM', 'MATH', 'PHY', 'IPE', 'CHE', 'BECM', 'ME', 'URP', 'ARCHI', 'CE']
-    dept = st.sidebar.selectbox('Select Department', depts).lower()
-    prof = st.sidebar.checkbox('Professor', value = True)
-    assistant_prof = st.sidebar.checkbox('Assistant Professor', value = True)
-    associate_prof = st.sidebar.checkbox('Associate Professor', value = True)
-    lecturer = st.sidebar.checkbox('Lecturer', value = True)
-    senior_lecturer = st.sidebar.checkbox('Senior Lecturer', value = True)
-    instructor = st.sidebar.checkbox('Instructor', value = True)
-    options = []
-
-    if prof:
-        options.append('Professor')
-    if assistant_prof:
-        options.append('Assistant Professor')
-    if associate_prof:
-        options.append('Associate Professor')
-    if lecturer:
-        options.append('Lecturer')
-    if senior_lecturer:
-        options.append('Senior Lecturer')
-    if instructor:
-        options.append('Instructor')
-
-    if dept:
+    depts = [ALL_DEPTS] + DEPTS
+    dept = st.sidebar.selectbox('Select Department', depts, index=1).lower()
+    options = [design for design in DESIGNATIONS if st.sidebar.checkbox(design, value = True)]
+
+    if dept == ALL_DEPTS.lower():
+        filtered_data, errors = get_all_data(options)
+        for failed, error in errors.items():
+            st.warning(f'{failed}: {error}')
+        st.dataframe(filtered_data)
+    elif dept:
         filtered_data = get_data(dept, options)
         st.dataframe(filtered_data)
-        
+
+        with st.expander('Change History'):
+            st.dataframe(get_snapshot_store().history(dept), hide_index=True)
+
 
 
 